@@ -1,142 +1,138 @@
 import os
 from dotenv import load_dotenv
 load_dotenv()
-import pyupbit
-import pandas as pd
-import pandas_ta as ta
-from pydantic import BaseModel
 import json
-from openai import OpenAI
-from tavily import TavilyClient
 import schedule
 import time
-import requests
-from PIL import Image
-import io
-from datetime import datetime
-import sqlite3
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, WebDriverException, NoSuchElementException
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+from candle_store import CandleStore
+from fear_greed_store import FearGreedStore
+from news_store import NewsStore
+from decision_store import DecisionStore
+from llm_cache import CacheMiss, cache_from_env
+from chart_browser import ChartBrowserSession
+from chart_renderer import render_chart_png
+from indicator_engine import IndicatorEngine, INDICATOR_COLUMNS
+from image_encoding import detect_image_format, encode_image, image_mime_type
+from market_snapshot import MarketSnapshotCache
+from retry_policy import get_policy
+from hedged_request import DeadlineExceeded, LatencyTracker, hedged_call
+from market_data import prepare_market_frames, serialize_market_data, compare_payloads, truncate_market_data
+from prompt_builder import PromptSection, build_prompt, log_prompt_cache_usage
+from token_counter import count_tokens
 import logging
-import base64
 
 
 
 # Setup
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-upbit = pyupbit.Upbit(os.getenv("UPBIT_ACCESS_KEY"), os.getenv("UPBIT_SECRET_KEY"))
+# openai / pyupbit / tavily / requests / pandas / selenium / PIL은 실제로 쓰는 함수 안에서 처음 불러옴 (시작 시간 단축)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
-
-class TradingDecision(BaseModel):
-    decision: str
-    percentage: int
-    reason: str
-
-def initialize_db(db_path='trading_decisions.sqlite'):
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS decisions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp DATETIME,
-                decision TEXT,
-                percentage REAL,
-                reason TEXT,
-                btc_balance REAL,
-                krw_balance REAL,
-                btc_avg_buy_price REAL,
-                btc_krw_price REAL,
-                btc_krw_balance REAL,
-                total_krw_balance REAL
-            );
-        ''')
-        conn.commit()
+candle_store = CandleStore()
+fear_greed_store = FearGreedStore()
+news_store = NewsStore()
+decision_store = DecisionStore('trading_decisions.sqlite')  # 열 때 스키마 마이그레이션 적용
+llm_cache = cache_from_env()  # LLM_CACHE_MODE: live(기본) / record / replay
+# 사이클당 한 번 받은 호가를 상태 작성 / 주문 확인에 공유 (SNAPSHOT_MAX_AGE초가 지나면 다시 받음)
+market_snapshots = MarketSnapshotCache("KRW-BTC", max_age_seconds=float(os.getenv("SNAPSHOT_MAX_AGE", "120")))
+# 실시간 시세 WebSocket (MARKET_FEED=0이면 사용 안 함, MARKET_FEED_URL로 재생 서버 지정 가능)
+MARKET_FEED_ENABLED = os.getenv("MARKET_FEED", "1") == "1"
+chart_session = ChartBrowserSession(
+    os.getenv("ENVIRONMENT"),
+    render_timeout=float(os.getenv("CHART_RENDER_TIMEOUT", "5")),  # 차트 렌더링 대기 상한 (초)
+)
+atexit.register(chart_session.close)
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_openai_client():
+    with _clients_lock:
+        if "openai" not in _clients:
+            from openai import OpenAI
+            # 재시도는 retry_policy의 "openai" 정책으로 처리 (SDK 자체 재시도와 겹치지 않도록 끔)
+            _clients["openai"] = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        return _clients["openai"]
+
+def get_upbit():
+    with _clients_lock:
+        if "upbit" not in _clients:
+            from http_client import get_pyupbit
+            _clients["upbit"] = get_pyupbit().Upbit(os.getenv("UPBIT_ACCESS_KEY"), os.getenv("UPBIT_SECRET_KEY"))
+        return _clients["upbit"]
+
+def get_tavily_client():
+    with _clients_lock:
+        if "tavily" not in _clients:
+            from tavily import TavilyClient
+            from http_client import get_session
+            api_key = os.getenv("TAVILY_API_KEY")  # 환경 변수에서 API 키 가져오기
+            _clients["tavily"] = TavilyClient(api_key=api_key, session=get_session("tavily"))
+        return _clients["tavily"]
+
+# 차트 이미지 생성 방식 - local: OHLCV로 직접 그림, browser: 업비트 차트 스크린샷, none: 차트 없이 진행
+CHART_SOURCE = os.getenv("CHART_SOURCE", "local")
+CHART_CANDLE_COUNT = 120  # 로컬 차트에 표시할 4시간봉 개수
+NEWS_TOP_K = int(os.getenv("NEWS_TOP_K", "20"))  # 프롬프트로 보낼 최근 뉴스 개수 (중복 제거 후)
+# 모델 응답 지연 대응 - 관측한 응답 시간의 LLM_HEDGE_PERCENTILE 백분위(표본이 적으면 LLM_HEDGE_AFTER초)까지 답이 없으면
+# 추가 요청을 보내 먼저 온 유효한 답을 쓰고, LLM_DEADLINE초 안에 답이 없으면 이번 사이클은 hold
+LLM_HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL", "")  # 추가 요청 모델 (비우면 같은 모델로 중복 요청, 예: o1-mini)
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "90"))
+llm_latency = LatencyTracker(
+    percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "0.9")),
+    default=float(os.getenv("LLM_HEDGE_AFTER", "30")),
+)
+# 차트 이미지 인코딩 설정 (크기 / 포맷 / 품질 / 잘라낼 영역 / 팔레트 색 수)
+# AUTO는 팔레트 PNG / WEBP / JPEG 중 가장 작은 결과를 사용 - 렌더링한 1280x800 차트는 팔레트 PNG가 가장 작고
+# 원본 PNG의 약 절반(1.8배 감소)이며, 큰 폭의 감소는 여백을 잘라내고 WEBP / JPEG로 바꾸는 브라우저 스크린샷에서 나옴
+CHART_IMAGE_OPTIONS = {
+    "max_size": (int(os.getenv("CHART_IMAGE_MAX_SIZE", "1280")),) * 2,
+    "image_format": os.getenv("CHART_IMAGE_FORMAT", "AUTO"),
+    "quality": int(os.getenv("CHART_IMAGE_QUALITY", "80")),
+    "crop_box": tuple(int(v) for v in os.getenv("CHART_IMAGE_CROP").split(",")) if os.getenv("CHART_IMAGE_CROP") else None,
+    "auto_crop": True,
+    "palette_colors": int(os.getenv("CHART_IMAGE_COLORS", "64")) or None,  # 0이면 팔레트 축소 안 함 (PNG / AUTO)
+}
+# 프롬프트 전체 토큰 한도 및 구역별 예산 (이름: (예산, 우선순위) - 우선순위가 낮을수록 먼저 줄임)
+PROMPT_TOKEN_CEILING = int(os.getenv("PROMPT_TOKEN_CEILING", "12000"))
+PROMPT_SECTION_BUDGETS = {
+    "market_data": (6000, 3),
+    "last_decisions": (1500, 2),
+    "bitcoin_news": (2000, 1),
+    "fear_and_greed": (800, 1),
+    "current_status": (1500, 3),
+}
 
 def save_decision_to_db(decision, current_status):
-    db_path = 'trading_decisions.sqlite'
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-    
-        # Parsing current_status from JSON to Python dict
-        status_dict = json.loads(current_status)
-        current_price = pyupbit.get_orderbook(ticker="KRW-BTC")['orderbook_units'][0]["ask_price"]
-        
-        # Preparing data for insertion
-        data_to_insert = (
-            decision.get('decision'),
-            decision.get('percentage', 100),  # Defaulting to 100 if not provided
-            decision.get('reason', ''),  # Defaulting to an empty string if not provided
-            status_dict.get('btc_balance'),
-            status_dict.get('krw_balance'),
-            status_dict.get('btc_avg_buy_price'),
-            status_dict.get('btc_krw_price'),
-            status_dict.get('btc_krw_balance'),
-            status_dict.get('total_krw_balance')
-        )
-        
-        # Inserting data into the database
-        cursor.execute('''
-            INSERT INTO decisions (timestamp, decision, percentage, reason, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, btc_krw_balance, total_krw_balance)
-            VALUES (datetime('now', 'localtime'), ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', data_to_insert)
-    
-        conn.commit()
+    # Parsing current_status from JSON to Python dict
+    # (가격은 상태 작성 시점의 스냅샷 값을 그대로 기록하므로 호가를 다시 받지 않음)
+    status_dict = json.loads(current_status)
+    decision_store.save(decision, status_dict)
 
-def fetch_last_decisions(db_path='trading_decisions.sqlite', num_decisions=10):
+def fetch_last_decisions(num_decisions=10):
     logger.info("Fetch late decisions data...")
 
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT timestamp, decision, percentage, reason, btc_balance, krw_balance, btc_avg_buy_price, btc_krw_price, btc_krw_balance, total_krw_balance FROM decisions
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (num_decisions,))
-        decisions = cursor.fetchall()
-
-        if decisions:
-            formatted_decisions = []
-            for decision in decisions:
-                # Converting timestamp to milliseconds since the Unix epoch
-                ts = datetime.strptime(decision[0], "%Y-%m-%d %H:%M:%S")
-                ts_millis = int(ts.timestamp() * 1000)
-                
-                formatted_decision = {
-                    "timestamp": ts_millis,
-                    "decision": decision[1],
-                    "percentage": decision[2],
-                    "reason": decision[3],
-                    "btc_balance": decision[4],
-                    "krw_balance": decision[5],
-                    "btc_avg_buy_price": decision[6],
-                    "btc_krw_price": decision[7],
-                    "btc_krw_balance": decision[8],
-                    "total_krw_balance": decision[9]
-                }
-                formatted_decisions.append(str(formatted_decision))
-            return "\n".join(formatted_decisions)
-        else:
-            return "No decisions found."
+    decisions = decision_store.last(num_decisions)
+    if decisions:
+        return "\n".join(str(decision) for decision in decisions)
+    else:
+        return "No decisions found."
 
-def get_current_status():
+def get_current_status(snapshot=None):
     logger.info("Fetch current status data...")
+    # 호가 한 번으로 현재가까지 사용 (최우선 매도 호가)
+    snapshot = snapshot or market_snapshots.refresh()
     
-    orderbook = pyupbit.get_orderbook(ticker="KRW-BTC")
-    current_time = orderbook['timestamp']
+    orderbook = snapshot.orderbook
+    current_time = snapshot.timestamp
     btc_balance = 0
     krw_balance = 0
     total_krw_balance = 0
     btc_avg_buy_price = 0
-    btc_krw_price = pyupbit.get_current_price("KRW-BTC")
+    btc_krw_price = snapshot.ask_price
     btc_krw_balance = 0
-    balances = upbit.get_balances()
+    balances = get_policy("upbit").call(get_upbit().get_balances)
     for b in balances:
         if b['currency'] == "BTC":
             btc_balance = float(b['balance'])
@@ -157,189 +153,105 @@ def get_current_status():
     }
     return json.dumps(current_status)
 
+def truncate_status(current_status, budget):
+    # 호가 단계를 뒤에서부터(최우선 호가에서 먼 것부터) 줄여 예산에 맞춤
+    status = json.loads(current_status)
+    units = status.get('orderbook', {}).get('orderbook_units', [])
+    content = json.dumps(status)
+    while units and count_tokens(content) > budget:
+        units.pop()
+        content = json.dumps(status)
+    return content
+
+# 봉 단위별 지표 엔진 - 새 봉만 반영해 지표를 갱신 (indicators.add_indicators와 같은 결과)
+indicator_engines = {}
+
+def add_indicators_incremental(df, interval):
+    engine = indicator_engines.setdefault(interval, IndicatorEngine())
+    indicators = engine.update_frame(df)
+    df[INDICATOR_COLUMNS] = indicators
+    return df
+
 def fetch_and_prepare_data():
     logger.info("Fetch and prepare data...")
 
     # Fetch data
-    df_daily = pyupbit.get_ohlcv("KRW-BTC", "day", count=30)
-    df_hourly = pyupbit.get_ohlcv("KRW-BTC", interval="minute60", count=24)
-
-    # Define a helper function to add indicators
-    def add_indicators(df):
-        # Moving Averages
-        df['SMA_7'] = ta.sma(df['close'], length=7)
-        df['EMA_7'] = ta.ema(df['close'], length=7)
-        df['EMA_14'] = ta.ema(df['close'], length=14)
-        df['EMA_35'] = ta.ema(df['close'], length=35)
-        # df['EMA_100'] = ta.ema(df['close'], length=100)
-
-        # RSI
-        df['RSI_14'] = ta.rsi(df['close'], length=14)
-
-        # Stochastic Oscillator
-        stoch = ta.stoch(df['high'], df['low'], df['close'], k=14, d=3, smooth_k=3)
-        df = df.join(stoch)
-
-        # MACD
-        ema_fast = df['close'].ewm(span=12, adjust=False).mean()
-        ema_slow = df['close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = ema_fast - ema_slow
-        df['Signal_Line'] = df['MACD'].ewm(span=9, adjust=False).mean()
-        df['MACD_Histogram'] = df['MACD'] - df['Signal_Line']
-
-        # Bollinger Bands
-        df['Middle_Band'] = df['close'].rolling(window=20).mean()
-        # Calculate the standard deviation of closing prices over the last 20 days
-        std_dev = df['close'].rolling(window=20).std()
-        # Calculate the upper band (Middle Band + 2 * Standard Deviation)
-        df['Upper_Band'] = df['Middle_Band'] + (std_dev * 2)
-        # Calculate the lower band (Middle Band - 2 * Standard Deviation)
-        df['Lower_Band'] = df['Middle_Band'] - (std_dev * 2)
-
-        return df
-
-    # Add indicators to both dataframes
-    df_daily = add_indicators(df_daily)
-    df_hourly = add_indicators(df_hourly)
-
-    combined_df = pd.concat([df_daily, df_hourly], keys=['daily', 'hourly'])
-    combined_data = combined_df.to_json(orient='split')
-
-    return json.dumps(combined_data)
-
-def fetch_fear_and_greed_index(limit=1, date_format=''):
+    # 백테스트와 같은 준비 단계 (워밍업 구간까지 받아 지표를 계산한 뒤 전송할 최근 행만 남김)
+    frames = prepare_market_frames(
+        lambda interval, count: candle_store.get_ohlcv("KRW-BTC", interval, count=count),
+        add_indicators_incremental,
+    )
+    if logger.isEnabledFor(logging.DEBUG):
+        # 기존 이중 인코딩 방식과 크기 비교 (디버그 로그에서만)
+        compare_payloads(frames)
+    data_json = serialize_market_data(frames)
+    logger.info(f"Market data payload: {len(data_json):,} chars, {count_tokens(data_json):,} tokens")
+
+    return data_json
+
+def fetch_fear_and_greed_index(limit=1):
     """
     Fetches the latest Fear and Greed Index data.
+    로컬 저장소에 없는 날짜만 받아오므로, 하루 한 번 갱신되는 지수를 매 사이클 다시 받지 않습니다.
     Parameters:
     - limit (int): Number of results to return. Default is 1.
-    - date_format (str): Date format ('us', 'cn', 'kr', 'world'). Default is '' (unixtime).
     Returns:
-    - dict or str: The Fear and Greed Index data in the specified format.
+    - str: 최신순 "YYYY-MM-DD value classification" 형식의 줄 목록
     """
     logger.info("Fetch fear and greed data...")
-    base_url = "https://api.alternative.me/fng/"
-    params = {
-        'limit': limit,
-        'format': 'json',
-        'date_format': date_format
-    }
-    response = requests.get(base_url, params=params)
-    myData = response.json()['data']
-    resStr = ""
-    for data in myData:
-        resStr += str(data)
-    return resStr
-
-def capture_and_encode_screenshot(driver):
+    return fear_greed_store.get_series(limit)
+
+def capture_and_encode_screenshot(session):
     try:
-        # 스크린샷 캡처
-        png = driver.get_screenshot_as_png()
-        
-        # PIL Image로 변환
-        img = Image.open(io.BytesIO(png))
-        
-        # 이미지 리사이즈 (OpenAI API 제한에 맞춤)
-        img.thumbnail((2000, 2000))
-        
-        # 이미지를 바이트로 변환
-        buffered = io.BytesIO()
-        img.save(buffered, format="PNG")
-        
-        # base64로 인코딩
-        base64_image = base64.b64encode(buffered.getvalue()).decode('utf-8')
-        
-        return base64_image
+        # 스크린샷 캡처 (유지 중인 차트 세션 사용)
+        png = session.get_screenshot_png()
+        return encode_image(png, **CHART_IMAGE_OPTIONS)
     except Exception as e:
         logger.error(f"스크린샷 캡처 및 인코딩 중 오류 발생: {e}")
         return None
 
+def render_and_encode_chart():
+    try:
+        # 지표 워밍업 구간만큼 더 받아서 지표를 계산한 뒤 잘라냄
+        from indicators import INDICATOR_WARMUP_BARS
+        df = candle_store.get_ohlcv("KRW-BTC", "minute240", count=CHART_CANDLE_COUNT + INDICATOR_WARMUP_BARS)
+        df = add_indicators_incremental(df, "minute240").tail(CHART_CANDLE_COUNT)
+        return encode_image(render_chart_png(df), **CHART_IMAGE_OPTIONS)
+    except Exception as e:
+        logger.error(f"로컬 차트 렌더링 중 오류 발생: {e}")
+        return None
+
 def get_current_base64_image():
     logger.info("Fetch current chart image data...")
 
-    env = os.getenv("ENVIRONMENT")
+    if CHART_SOURCE == "none":
+        return ""
     try:
-        # 로컬용 / Ec2용 셋팅 - Set up Chrome options for headless mode
-        logger.info("ChromeDriver 설정 중...")
-        chrome_options = Options()
-        chrome_options.add_argument("--start-maximized")
-        chrome_options.add_argument("--headless")  # 디버깅을 위해 헤드리스 모드 비활성화
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-
-        if env == "local":
-            chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            service = Service(ChromeDriverManager().install())
-        elif env == "ec2":
-            service = Service('/usr/bin/chromedriver')
+        start = time.perf_counter()
+        if CHART_SOURCE == "browser":
+            chart_image = capture_and_encode_screenshot(chart_session)
         else:
-            raise ValueError(f"Unsupported environment. Only local or ec2: {env}")
-
-        # Initialize the WebDriver with the specified options
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-
-        # Navigate to the desired webpage
-        driver.get("https://upbit.com/full_chart?code=CRIX.UPBIT.KRW-BTC")
-        logger.info("페이지 로드 완료")
-
-        logger.info("차트 작업 시작")
-        # Wait for the page to load completely
-        wait = WebDriverWait(driver, 10)  # 10 seconds timeout
-
-        # Wait for the first menu item to be clickable and click it (시간메뉴)
-        first_menu_item = wait.until(EC.element_to_be_clickable((By.XPATH, "//*[@id='fullChartiq']/div/div/div[1]/div/div/cq-menu[1]")))
-        first_menu_item.click()
-
-        # Wait for the "4 Hour" option to be clickable and click it
-        four_hour_option = wait.until(EC.element_to_be_clickable((By.XPATH, "//cq-item[@stxtap=\"Layout.setPeriodicity(4,60,'minute')\"]")))
-        four_hour_option.click()
-
-        # Wait for the indicators menu item to be clickable and click it (지표메뉴)
-        indicators_menu_item = wait.until(EC.element_to_be_clickable((By.XPATH, "//*[@id='fullChartiq']/div/div/div[1]/div/div/cq-menu[3]")))
-        indicators_menu_item.click()
-
-        bolinger_band = wait.until(EC.element_to_be_clickable((By.XPATH, "//cq-item[translate[@original='Bollinger Bands']]")))
-        bolinger_band.click()
-
-        # Wait for the indicators menu item to be clickable and click it (지표메뉴)
-        indicators_menu_item = wait.until(EC.element_to_be_clickable((By.XPATH, "//*[@id='fullChartiq']/div/div/div[1]/div/div/cq-menu[3]")))
-        indicators_menu_item.click()
-
-        # Wait for the indicators container to be present
-        indicators_container = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "cq-scroll.ps-container")))
-
-        # Scroll the container to make the "MACD" indicator visible
-        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight / 2.5", indicators_container)
-
-        # Wait for the "MACD" indicator to be clickable and click it
-        macd_indicator = wait.until(EC.element_to_be_clickable((By.XPATH, "//cq-item[translate[@original='MACD']]")))
-        macd_indicator.click()
-        time.sleep(5)
-        logger.info("차트 작업 완료")
-
-        # Take a screenshot to verify the actions
-        chart_image = capture_and_encode_screenshot(driver)
-        logger.info(f"스크린샷 캡처 완료.")
+            chart_image = render_and_encode_chart()
+        if not chart_image:
+            return ""
+        logger.info(f"차트 이미지 생성 완료. ({CHART_SOURCE}, {time.perf_counter() - start:.2f}s)")
+        return chart_image
     except Exception as e:
         logger.error(f"현재 차트 이미지 생성 중 오류 발생: {e}")
         return ""
-    finally:
-        # Close the browser
-        driver.quit()
-        return chart_image
 
 def fetch_bitcoin_news():
     """
-    Tavily API를 사용해 최근 7일간의 영어 비트코인 뉴스를 검색하여 반환합니다.
-    
+    Tavily API로 영어 비트코인 뉴스를 검색해 로컬 뉴스 저장소에 쌓고, 최근 7일 중 중복을 뺀 상위 기사를 반환합니다.
+    검색은 마지막으로 본 기사 이후 기간만 요청합니다.
+
     Returns:
-        list: 기사 제목, 내용, 게시 날짜가 포함된 딕셔너리의 리스트
+        str: 최신순 "게시 시각 | 출처 | 제목" 줄 목록
     """
     logger.info("Fetch Bitcoin news data...")
 
-    # Tavily API 클라이언트 설정
-    api_key = os.getenv("TAVILY_API_KEY")  # 환경 변수에서 API 키 가져오기
-    client = TavilyClient(api_key=api_key)
+    # Tavily API 클라이언트 (공용 연결 풀을 쓰도록 한 번만 만듦)
+    client = get_tavily_client()
 
     result = "No news data available."
 
@@ -347,71 +259,88 @@ def fetch_bitcoin_news():
     query = "bitcoin"
     search_options = {
         "topic": "news",        # 뉴스 주제
-        "days": 7,              # 최근 7일간 검색
-        "max_results": 30,      # 최대 10개의 결과
+        "max_results": 30,      # 최대 30개의 결과
         "language": "en",       # 영어 기사
         "sort": "date_desc",    # 날짜 내림차순 (최근 날짜 순)
         "include_raw_content": False  # 기사 내용 포함
     }
-    
+
+    def search(days):
+        # Tavily API 호출 - 저장소가 정한 기간만 검색
+        response = get_policy("tavily").call(client.search, query, days=days, **search_options)
+        return response.get("results", [])
+
     try:
-        # Tavily API 호출
-        response = client.search(query, **search_options)
-
-        # 결과 데이터 정리
-        articles = []
-        for result in response.get("results", []):
-            articles.append({
-                "title": result.get("title"),
-                "source": result.get("url").split('/')[2],  # URL에서 출처 추출
-                "published_date": result.get("published_date")
-            })
-
-        result = str(articles)
+        result = news_store.get_news(search, k=NEWS_TOP_K) or result
     except Exception as e:
         logger.error(f"Error fetching Bitcoin news: {e}")
 
-    return result    
+    return result
+
+# 지시문 캐시 - 파일 경로: (수정 시각, 시스템 메시지)
+_instructions_cache = {}
 
 def get_instructions(file_path):
     try:
+        mtime = os.path.getmtime(file_path)
+        cached = _instructions_cache.get(file_path)
+        if cached and cached[0] == mtime:
+            return cached[1]["content"]
         with open(file_path, "r", encoding="utf-8") as file:
             instructions = file.read()
+        # 시스템 메시지는 내용이 바뀔 때만 새로 만들어, 매 사이클 같은 접두부가 전송되도록 함 (프롬프트 캐싱)
+        _instructions_cache[file_path] = (mtime, {"role": "system", "content": instructions})
+        logger.info(f"Instructions loaded: {file_path}")
         return instructions
     except FileNotFoundError:
         logger.error("File not found.")
     except Exception as e:
-        logger.error("An error occurred while reading the file:", e)
+        logger.error(f"An error occurred while reading the file: {e}")
+
+def get_system_message(file_path):
+    if not get_instructions(file_path):
+        return None
+    return _instructions_cache[file_path][1]
+
+def build_market_prompt(data_json, last_decisions, bitcoin_news, fear_and_greed, current_status):
+    def section(name, label, content, **options):
+        budget, priority = PROMPT_SECTION_BUDGETS[name]
+        return PromptSection(name, label, content, budget, priority, **options)
+
+    prompt, _ = build_prompt([
+        section("market_data", "Market Analysis", data_json, truncate=truncate_market_data),
+        section("last_decisions", "Previous Decisions", last_decisions, separator="\n"),
+        section("bitcoin_news", "Cryptocurrency News", bitcoin_news, separator="\n"),
+        section("fear_and_greed", "Fear and Greed Index", fear_and_greed, separator="\n"),
+        section("current_status", "Current Investment State", current_status, truncate=truncate_status),
+    ], PROMPT_TOKEN_CEILING)
+    return prompt
 
 def analyze_data_with_gpt4(data_json, last_decisions, bitcoin_news, fear_and_greed, current_status, current_base64_image):
     instructions_path = "instructions_sj_v5.md"
     try:
-        instructions = get_instructions(instructions_path)
-        if not instructions:
+        system_message = get_system_message(instructions_path)
+        if not system_message:
             logger.info("No instructions found.")
             return None          
-        response = client.chat.completions.create(
-            model="gpt-4.5-preview",
-            messages=[
-                {"role": "system", "content": instructions},  # 역할 및 전략 설명
-                
-                {"role": "user", "content": f"""
-                    Here is the latest market data and relevant analysis:
-                    - **Market Analysis**: {data_json}
-                    - **Previous Decisions**: {last_decisions}
-                    - **Cryptocurrency News**: {bitcoin_news}
-                    - **Fear and Greed Index**: {fear_and_greed}
-                    - **Current Investment State**: {current_status}
-                """},
-
-                {"role": "user", "content": [{
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/png;base64,{current_base64_image}"
-                    }
-                }]}
-            ],
-            response_format={"type": "json_object"},
+        prompt = build_market_prompt(data_json, last_decisions, bitcoin_news, fear_and_greed, current_status)
+        messages = [
+            system_message,  # 역할 및 전략 설명 (고정 접두부 - 프롬프트 캐싱 대상)
+
+            {"role": "user", "content": prompt},
+        ]
+        # 차트가 비활성화되었거나 생성에 실패하면 이미지 없이 요청
+        if current_base64_image:
+            messages.append({"role": "user", "content": [{
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:{image_mime_type(detect_image_format(current_base64_image))};base64,{current_base64_image}"
+                }
+            }]})
+        from decision_schema import hold_decision, normalize_decision, parse_decision, response_format
+        model = "gpt-4.5-preview"
+        params = dict(
+            response_format=response_format(),  # TradingDecision 스키마 강제 (decision 값 / percentage 범위 포함)
 
             # 하이퍼파라미터 조정
             temperature=0.6,        # 중간 정도 창의성 (데이터 기반이지만 변동성 대응 가능)
@@ -419,9 +348,47 @@ def analyze_data_with_gpt4(data_json, last_decisions, bitcoin_news, fear_and_gre
             frequency_penalty=0.2,  # 반복 억제 증가 (동일한 매매 전략 반복 방지)
             presence_penalty=0.3    # 새로운 패턴 탐색 적절히 제한 (기존 패턴 유지하면서도 일부 탐색 가능)
         )
-        advice = response.choices[0].message.content
-        logger.info(f" ## AI Result: {advice}")
+
+        deadline_at = time.monotonic() + LLM_DEADLINE
+
+        def request(model, messages, params):
+            def run():
+                # 남은 시간을 요청 timeout으로 지정해, 상한이 지난 요청이 스레드를 붙잡지 않도록 함
+                client = get_openai_client().with_options(timeout=max(1.0, deadline_at - time.monotonic()))
+                # 연결 오류 / 요청 수 제한 / 서버 오류만 백오프 후 재시도 (잘못된 요청 / 인증 오류는 바로 실패)
+                response = get_policy("openai").call(
+                    client.chat.completions.create, model=model, messages=messages, deadline_at=deadline_at, **params
+                )
+                log_prompt_cache_usage(response.usage)
+                return response.choices[0].message.content
+            return run
+
+        hedge = None
+        if LLM_HEDGE_MODEL:
+            # o1-mini 경로와 같은 요청 - 이미지 / 샘플링 파라미터 / json_schema 없이 텍스트 프롬프트 + JSON 모드
+            hedge = request(LLM_HEDGE_MODEL, messages[:2], {"response_format": {"type": "json_object"}})
+
+        def call():
+            advice, label = hedged_call(
+                request(model, messages, params), hedge,
+                deadline=max(0.0, deadline_at - time.monotonic()),
+                validate=lambda advice: parse_decision(advice) is not None,
+                tracker=llm_latency,
+            )
+            # hedge가 이기면 그 모델의 응답 (LLM_HEDGE_MODEL이 비어 있으면 같은 모델로 보낸 중복 요청)
+            return advice, (LLM_HEDGE_MODEL or model) if label == "hedge" else model
+
+        # 같은 요청은 LLM_CACHE_MODE(record / replay)에 따라 저장된 응답을 사용
+        # (봇이 받아들이는 응답 - 로컬에서 고친 것 포함 - 을 정규화한 결정 JSON으로, 실제로 응답한 모델과 함께 저장)
+        advice, answered_by = llm_cache.complete(model, messages, params, call, normalize=normalize_decision)
+        logger.info(f" ## AI Result ({answered_by}): {advice}")
         return advice
+    except CacheMiss:
+        # replay 모드에서 기록이 없는 요청은 hold로 바꾸지 않고 호출한 쪽에 알림
+        raise
+    except DeadlineExceeded as e:
+        logger.error(f"Model response deadline exceeded, defaulting to hold: {e}")
+        return hold_decision(f"No model response within {LLM_DEADLINE:.0f}s; defaulted to hold.").model_dump_json()
     except Exception as e:
         logger.error(f"Error in analyzing data with GPT-4: {e}")
         return None
@@ -429,6 +396,7 @@ def analyze_data_with_gpt4(data_json, last_decisions, bitcoin_news, fear_and_gre
 def execute_buy(percentage):
     logger.info("Attempting to buy BTC with a percentage of KRW balance...")
     try:
+        upbit = get_upbit()
         krw_balance = upbit.get_balance("KRW")
         amount_to_invest = krw_balance * (percentage / 100)
         if amount_to_invest > 5000:  # Ensure the order is above the minimum threshold
@@ -439,12 +407,14 @@ def execute_buy(percentage):
     except Exception as e:
         logger.error(f"Failed to execute buy order: {e}")
 
-def execute_sell(percentage):
+def execute_sell(percentage, snapshot=None):
     logger.info("Attempting to sell a percentage of BTC...")
     try:
+        upbit = get_upbit()
         btc_balance = upbit.get_balance("BTC")
         amount_to_sell = btc_balance * (percentage / 100)
-        current_price = pyupbit.get_orderbook(ticker="KRW-BTC")['orderbook_units'][0]["ask_price"]
+        # 상태 작성 때 받은 호가를 재사용하고, 오래되었을 때만 다시 받음
+        current_price = (snapshot or market_snapshots.get()).ask_price
         if current_price * amount_to_sell > 5000:  # Ensure the order is above the minimum threshold
             upbit.sell_market_order("KRW-BTC", amount_to_sell)
             logger.info(f" ## Sell order successful.")
@@ -455,50 +425,158 @@ def execute_sell(percentage):
     except Exception as e:
         logger.error(f"Failed to execute buy order: {e}")
 
+# 데이터 수집 단계 설정 - 이름: (수집 함수, 타임아웃(초), 실패 시 기본값, 필수 여부)
+# 필수 소스가 실패하면 사이클을 중단하고, 선택 소스는 기본값으로 대체합니다.
+GATHER_SOURCES = {
+    "data_json": (fetch_and_prepare_data, 20, None, True),
+    "last_decisions": (fetch_last_decisions, 5, "No decisions found.", False),
+    "bitcoin_news": (fetch_bitcoin_news, 15, "No news data available.", False),
+    "fear_and_greed": (lambda: fetch_fear_and_greed_index(limit=30), 10, "No fear and greed data available.", False),
+    "current_status": (get_current_status, 10, None, True),
+    "current_base64_image": (get_current_base64_image, 60, "", False),
+}
+# 사이클마다 풀을 새로 만들지 않고 하나를 계속 사용 (타임아웃된 작업이 끝날 때까지 자리를 차지해도
+# 다음 사이클이 밀리지 않도록 소스 수의 두 배로 둠)
+gather_executor = ThreadPoolExecutor(max_workers=2 * len(GATHER_SOURCES), thread_name_prefix="gather")
+atexit.register(gather_executor.shutdown, wait=False, cancel_futures=True)
+
+def gather_cycle_data(sources=GATHER_SOURCES):
+    """
+    독립적인 데이터 수집 함수들을 스레드 풀에서 동시에 실행합니다.
+    Parameters:
+    - sources (dict): 이름 -> (함수, 타임아웃(초), 기본값, 필수 여부)
+    Returns:
+    - dict: 이름 -> 수집 결과 (실패 또는 타임아웃 시 기본값)
+    Raises:
+    - RuntimeError: 필수 소스를 가져오지 못한 경우
+    """
+    logger.info("Gathering cycle data concurrently...")
+    stage_start = time.perf_counter()
+    futures = {}
+    started = {}
+    for name, (func, _, _, _) in sources.items():
+        started[name] = time.perf_counter()
+        futures[name] = gather_executor.submit(func)
+
+    results = {}
+    timings = {}
+    missing_required = []
+    for name, (func, timeout, default, required) in sources.items():
+        # 타임아웃은 각 소스의 시작 시점부터 계산 (타임아웃된 작업은 기다리지 않고 넘어감)
+        remaining = max(0.0, started[name] + timeout - time.perf_counter())
+        try:
+            results[name] = futures[name].result(timeout=remaining)
+            timings[name] = f"{time.perf_counter() - started[name]:.2f}s"
+        except Exception as e:
+            futures[name].cancel()
+            status = "timeout" if not futures[name].done() else f"error: {e}"
+            timings[name] = f"{time.perf_counter() - started[name]:.2f}s ({status})"
+            logger.error(f"Failed to gather {name}: {status}")
+            results[name] = default
+            if required:
+                missing_required.append(name)
+
+    timing_report = ", ".join(f"{name}={elapsed}" for name, elapsed in timings.items())
+    logger.info(f" ## Gather stage: {timing_report}, total={time.perf_counter() - stage_start:.2f}s")
+
+    if missing_required:
+        raise RuntimeError(f"Required data unavailable: {', '.join(missing_required)}")
+    return results
+
 def make_decision_and_execute():
     logger.info("Making decision and executing...")
+    cycle_start = time.perf_counter()
+    from http_client import connection_stats, log_connection_stats
+    http_stats = connection_stats()
     try:
-        data_json = fetch_and_prepare_data()
-        last_decisions = fetch_last_decisions()
-        bitcoin_news = fetch_bitcoin_news()
-        fear_and_greed = fetch_fear_and_greed_index(limit=30)
-        current_status = get_current_status()
-        current_base64_image = get_current_base64_image()
+        gathered = gather_cycle_data()
+        data_json = gathered["data_json"]
+        last_decisions = gathered["last_decisions"]
+        bitcoin_news = gathered["bitcoin_news"]
+        fear_and_greed = gathered["fear_and_greed"]
+        current_status = gathered["current_status"]
+        current_base64_image = gathered["current_base64_image"]
     except Exception as e:
         logger.error(f"Error: {e}")
     else:
-        max_retries = 3
-        retry_delay_seconds = 5
-        decision = None
-        for attempt in range(max_retries):
-            try:
-                advice = analyze_data_with_gpt4(data_json, last_decisions, bitcoin_news, fear_and_greed, current_status, current_base64_image)
-                decision = json.loads(advice)
-                break
-            except Exception as e:
-                logger.error(f"JSON parsing failed: {e}. Retrying in {retry_delay_seconds} seconds...")
-                time.sleep(retry_delay_seconds)
-                logger.error(f"Attempt {attempt + 2} of {max_retries}")
-        if not decision:
-            logger.error("Failed to make a decision after maximum retries.")
+        from decision_schema import parse_decision
+        analysis_start = time.perf_counter()
+        try:
+            advice = analyze_data_with_gpt4(data_json, last_decisions, bitcoin_news, fear_and_greed, current_status, current_base64_image)
+        except CacheMiss as e:
+            logger.error(f"LLM replay cache miss, skipping this cycle: {e}")
+            return
+        # 스키마에 맞지 않는 응답은 다시 요청하지 않고 로컬에서 고침 (고칠 수 없으면 이번 사이클은 건너뜀)
+        decision = parse_decision(advice)
+        logger.info(f" ## Analysis stage: {time.perf_counter() - analysis_start:.2f}s")
+        if decision is None:
+            logger.error("Failed to make a decision: no valid model response.")
             return
         else:
+            execution_start = time.perf_counter()
             try:
-                percentage = decision.get('percentage', 100)
+                percentage = decision.percentage
 
-                if decision.get('decision') == "buy":
+                if decision.decision == "buy":
                     execute_buy(percentage)
-                elif decision.get('decision') == "sell":
-                    execute_sell(percentage)
+                elif decision.decision == "sell":
+                    execute_sell(percentage, market_snapshots.get())
                 
-                save_decision_to_db(decision, current_status)
+                save_decision_to_db(decision.model_dump(mode="json"), current_status)
             except Exception as e:
                 logger.error(f"Failed to execute the decision or save to DB: {e}")
+            logger.info(f" ## Execution stage: {time.perf_counter() - execution_start:.2f}s, cycle total={time.perf_counter() - cycle_start:.2f}s")
+            log_connection_stats(since=http_stats)
 
-if __name__ == "__main__":
-    initialize_db()
-    # test
-    make_decision_and_execute()
+# 첫 사이클 전에 백그라운드에서 미리 불러둘 무거운 모듈
+PRELOAD_MODULES = ["pandas", "pyupbit", "openai", "tavily", "http_client", "decision_schema", "PIL.Image"]
+
+def preload_dependencies(modules=PRELOAD_MODULES):
+    """
+    스케줄 대기 중에 무거운 모듈을 미리 불러와, 시작은 빠르게 하면서 첫 사이클의 import 지연을 없앱니다.
+    실패해도 해당 기능을 처음 쓸 때 다시 불러오므로 로그만 남깁니다.
+    """
+    import importlib
+    start = time.perf_counter()
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            logger.warning(f"모듈 미리 불러오기 실패 ({name}): {e}")
+    logger.info(f"의존 모듈 미리 불러오기 완료 ({time.perf_counter() - start:.2f}s)")
+
+def start_market_feed():
+    """WebSocket 시세 수신을 시작하고 스냅샷이 호가를 여기서 읽도록 연결합니다. 실패하면 REST로 계속 진행합니다."""
+    from market_feed import MarketFeed, UPBIT_WS_URL
+    try:
+        feed = MarketFeed(["KRW-BTC"], url=os.getenv("MARKET_FEED_URL", UPBIT_WS_URL)).start()
+        atexit.register(feed.stop)
+        market_snapshots.feed = feed
+        if not feed.wait_ready(timeout=10):
+            logger.warning("시세 WebSocket 첫 데이터 대기 시간 초과 - 준비될 때까지 REST 호가 사용")
+        return feed
+    except ImportError as e:
+        logger.error(f"websockets 패키지가 없어 시세 WebSocket을 사용하지 않습니다 (REST 호가 사용): {e}")
+        return None
+    except Exception as e:
+        logger.error(f"시세 WebSocket 시작 실패: {e}")
+        return None
+
+def main():
+    if MARKET_FEED_ENABLED:
+        start_market_feed()
+    # 차트 세션을 미리 띄워두어 첫 사이클부터 스크린샷만 찍도록 함
+    if CHART_SOURCE == "browser":
+        try:
+            chart_session.warm_up()
+        except Exception as e:
+            logger.error(f"차트 세션 초기화 실패: {e}")
+
+    # 시작 직후 테스트 사이클 - RUN_STARTUP_CYCLE=0이면 생략하고 바로 스케줄 대기 (빠른 시작)
+    if os.getenv("RUN_STARTUP_CYCLE", "1") == "1":
+        make_decision_and_execute()
+    else:
+        threading.Thread(target=preload_dependencies, name="preload", daemon=True).start()
 
     # Schedule the task to run at 00:01
     schedule.every().day.at("00:01").do(make_decision_and_execute)
@@ -509,9 +587,12 @@ if __name__ == "__main__":
     # Schedule the task to run at 12:01
     schedule.every().day.at("12:01").do(make_decision_and_execute)
 
-        # Schedule the task to run at 18:01
+    # Schedule the task to run at 18:01
     schedule.every().day.at("18:01").do(make_decision_and_execute)
 
     while True:
         schedule.run_pending()
         time.sleep(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import argparse
+import json
+import logging
+import time
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+from indicators import add_indicators, INDICATOR_WARMUP_BARS
+from market_data import prepare_market_frames, serialize_market_data
+from llm_cache import CacheMiss
+from candle_store import OHLCV_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# execute_buy / execute_sell과 같은 주문 조건
+MIN_ORDER_KRW = 5000
+ORDER_FEE_FACTOR = 0.9995  # execute_buy가 주문 금액에 곱하는 값
+UPBIT_FEE_RATE = 0.0005    # 업비트 KRW 마켓 거래 수수료 (체결 금액 기준)
+
+HOLD, BUY, SELL = 0, 1, 2
+DECISION_CODES = {"hold": HOLD, "buy": BUY, "sell": SELL}
+DECISION_NAMES = {code: name for name, code in DECISION_CODES.items()}
+
+def _epoch_ms(index):
+    # pyupbit 캔들 인덱스는 한국 시간(tz 없음)
+    return pd.DatetimeIndex(index).tz_localize('Asia/Seoul').as_unit('ms').asi8
+
+class RuleDecider:
+    """
+    규칙 기반 스텁 결정기 - RSI 과매도이면서 MACD 히스토그램이 양수면 매수, RSI 과매수이면서 음수면 매도.
+    decide_batch로 모든 봉의 결정을 한 번에 계산합니다 (각 행은 그 시점까지의 지표만 사용).
+    """
+
+    def __init__(self, rsi_buy=35, rsi_sell=65, percentage=30):
+        self.rsi_buy = rsi_buy
+        self.rsi_sell = rsi_sell
+        self.percentage = percentage
+
+    def decide_batch(self, df):
+        rsi = df['RSI_14'].to_numpy()
+        histogram = df['MACD_Histogram'].to_numpy()
+        codes = np.full(len(df), HOLD, dtype=np.int8)
+        codes[(rsi < self.rsi_buy) & (histogram > 0)] = BUY
+        codes[(rsi > self.rsi_sell) & (histogram < 0)] = SELL
+        return codes, np.full(len(df), float(self.percentage))
+
+class RecordedDecider:
+    """
+    기록된 결정(예: DecisionStore.last 결과)을 그 시각이 속한 봉에서 그대로 재생합니다.
+    records: 'timestamp'(epoch 밀리초), 'decision', 'percentage' 키를 가진 dict 목록
+    """
+
+    def __init__(self, records):
+        self.records = sorted(records, key=lambda record: record['timestamp'])
+
+    @classmethod
+    def from_store(cls, store, limit=1_000_000):
+        return cls(store.last(limit))
+
+    def _positions(self, df):
+        bar_ms = _epoch_ms(df.index)
+        record_ms = np.array([record['timestamp'] for record in self.records], dtype=np.int64)
+        return np.searchsorted(bar_ms, record_ms, side='right') - 1
+
+    def decision_rows(self, df, rows):
+        positions = self._positions(df)
+        return np.unique(positions[positions >= rows[0]]) if len(rows) else rows
+
+    def decide_batch(self, df):
+        codes = np.full(len(df), HOLD, dtype=np.int8)
+        percentages = np.zeros(len(df))
+        for position, record in zip(self._positions(df), self.records):
+            if position >= 0:
+                codes[position] = DECISION_CODES.get(record.get('decision'), HOLD)
+                percentages[position] = record.get('percentage', 100)
+        return codes, percentages
+
+def resample_daily(hourly):
+    """시간봉을 일봉으로 묶음 (업비트 일봉은 한국 시간 09:00에 시작하므로 같은 경계로 묶음)"""
+    return hourly[OHLCV_COLUMNS].resample('24h', offset='9h').agg({
+        'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum', 'value': 'sum',
+    }).dropna()
+
+class ModelDecider:
+    """
+    봇과 같은 준비 단계(market_data.prepare_market_frames)로 시장 데이터를 만들어 모델에 묻는 결정기입니다.
+    시간봉 이력에서 봇이 요청하는 봉 단위(시간봉 / 일봉)를 만들어 넘깁니다.
+    analyze(data_json, current_status_json) -> 모델의 JSON 응답 문자열
+    """
+
+    def __init__(self, analyze):
+        self.analyze = analyze
+
+    def prepare_data(self, history):
+        candles = history[OHLCV_COLUMNS]
+
+        def load(interval, count):
+            # 결정 시점까지의 이력만 사용 (CandleStore.get_ohlcv와 같이 최근 count개)
+            if interval == "minute60":
+                return candles.tail(count).copy()
+            if interval == "day":
+                return resample_daily(candles.tail((count + 1) * 24)).tail(count)
+            raise ValueError(f"Unsupported interval for hourly backtest history: {interval}")
+
+        return serialize_market_data(prepare_market_frames(load, lambda df, interval: add_indicators(df)))
+
+    def decide(self, history, status):
+        from decision_schema import parse_decision
+        decision = parse_decision(self.analyze(self.prepare_data(history), json.dumps(status)))
+        if decision is None:
+            raise ValueError("no valid model response")
+        return decision.model_dump(mode="json")
+
+def live_model_decider(cache_mode=None):
+    """
+    autotrade_sj_v5의 analyze_data_with_gpt4를 그대로 쓰는 결정기 (과거 뉴스 / 공포탐욕 / 차트 없이).
+    cache_mode를 주면 봇의 LLM 응답 캐시 모드를 바꿉니다 (replay면 API 호출 없이 기록된 응답만 사용).
+    """
+    import autotrade_sj_v5 as bot
+    if cache_mode is not None:
+        bot.llm_cache.mode = cache_mode
+
+    def analyze(data_json, current_status):
+        return bot.analyze_data_with_gpt4(
+            data_json, "No decisions found.", "No news data available.",
+            "No fear and greed data available.", current_status, "",
+        )
+    return ModelDecider(analyze)
+
+@dataclass
+class SimulatedAccount:
+    """
+    execute_buy / execute_sell과 같은 조건으로 시장가 주문을 모의 체결하는 계좌입니다.
+    - 매수: KRW 잔고 × 비율이 MIN_ORDER_KRW를 넘으면 그 금액 × ORDER_FEE_FACTOR를 주문, 수수료는 체결 금액에 더해 차감
+    - 매도: 보유 BTC × 비율의 평가 금액이 MIN_ORDER_KRW를 넘으면 매도, 수수료를 뺀 금액을 입금
+    """
+    krw: float
+    btc: float = 0.0
+    avg_buy_price: float = 0.0
+    fee_rate: float = UPBIT_FEE_RATE
+
+    def buy(self, percentage, price):
+        """Returns: (매수한 BTC, 주문 금액) 또는 최소 주문 금액 이하이면 None"""
+        amount_to_invest = self.krw * (percentage / 100)
+        if amount_to_invest <= MIN_ORDER_KRW:
+            return None
+        order = amount_to_invest * ORDER_FEE_FACTOR
+        bought = order / price
+        self.avg_buy_price = (self.btc * self.avg_buy_price + order) / (self.btc + bought)
+        self.krw -= order * (1 + self.fee_rate)
+        self.btc += bought
+        return bought, order
+
+    def sell(self, percentage, price):
+        """Returns: (매도한 BTC, 수수료를 뺀 입금액) 또는 최소 주문 금액 이하이면 None"""
+        amount_to_sell = self.btc * (percentage / 100)
+        if price * amount_to_sell <= MIN_ORDER_KRW:
+            return None
+        proceeds = amount_to_sell * price * (1 - self.fee_rate)
+        self.krw += proceeds
+        self.btc -= amount_to_sell
+        return amount_to_sell, proceeds
+
+    def value(self, price):
+        return self.krw + self.btc * price
+
+    def status(self, price):
+        # get_current_status와 같은 키 (호가 / 시각 제외)
+        return {
+            'btc_balance': self.btc, 'krw_balance': int(self.krw), 'btc_avg_buy_price': self.avg_buy_price,
+            'btc_krw_price': price, 'btc_krw_balance': int(self.btc * price), 'total_krw_balance': int(self.value(price)),
+        }
+
+@dataclass
+class BacktestResult:
+    equity: pd.Series  # 결정 시점별 총 평가 금액 (KRW)
+    trades: pd.DataFrame
+    initial_krw: float
+    benchmark: pd.Series  # 같은 기간 단순 보유 수익 (KRW)
+    elapsed: float
+
+    @property
+    def total_return(self):
+        return self.equity.iloc[-1] / self.initial_krw - 1 if len(self.equity) else 0.0
+
+    @property
+    def max_drawdown(self):
+        if not len(self.equity):
+            return 0.0
+        return float((self.equity / self.equity.cummax() - 1).min())
+
+    def summary(self):
+        benchmark = self.benchmark.iloc[-1] / self.initial_krw - 1 if len(self.benchmark) else 0.0
+        return (f"{len(self.equity):,} cycles, {len(self.trades):,} trades, return={self.total_return:.2%}, "
+                f"max_drawdown={self.max_drawdown:.2%}, buy_and_hold={benchmark:.2%}, elapsed={self.elapsed:.2f}s")
+
+def run_backtest(df, decider, step=6, initial_krw=1_000_000, warmup=INDICATOR_WARMUP_BARS, fee_rate=UPBIT_FEE_RATE):
+    """
+    저장된 캔들을 결정 주기마다 재생하며 결정기의 매수 / 매도를 모의 체결합니다.
+    Parameters:
+    - df (DataFrame): OHLCV 캔들 (CandleStore.load / pyupbit.get_ohlcv 형식)
+    - decider: decide_batch(df) -> (결정 코드 배열, 비율 배열) 또는 decide(이력 df, 상태 dict) -> 결정 dict
+    - step (int): 결정 주기 (봉 개수, 시간봉 기준 6이면 봇의 6시간 주기)
+    - warmup (int): 지표가 수렴하기 전이라 건너뛸 앞쪽 봉 개수
+    Returns:
+    - BacktestResult
+    """
+    start = time.perf_counter()
+    df = add_indicators(df.copy())
+    rows = np.arange(warmup, len(df), step)
+    if hasattr(decider, 'decision_rows'):
+        rows = decider.decision_rows(df, rows)
+
+    batch = hasattr(decider, 'decide_batch')
+    if batch:
+        codes, percentages = decider.decide_batch(df)
+        codes, percentages = codes[rows], percentages[rows]
+    prices = df['close'].to_numpy(dtype=float)
+
+    account = SimulatedAccount(float(initial_krw), fee_rate=fee_rate)
+    equity = np.empty(len(rows))
+    trades = []
+    for j, i in enumerate(rows):
+        price = prices[i]
+        if batch:
+            code, percentage = codes[j], percentages[j]
+        else:
+            try:
+                decision = decider.decide(df.iloc[:i + 1], account.status(price))
+                code, percentage = DECISION_CODES.get(decision.get('decision'), HOLD), decision.get('percentage', 100)
+            except CacheMiss:
+                # replay는 기록된 응답이 모두 있어야 의미가 있으므로 hold로 채우지 않고 중단
+                raise
+            except Exception as e:
+                logger.error(f"Decision failed at {df.index[i]}: {e}")
+                code, percentage = HOLD, 0
+
+        if code == BUY:
+            filled = account.buy(percentage, price)
+            if filled is not None:
+                trades.append((df.index[i], "buy", percentage, price) + filled)
+        elif code == SELL:
+            filled = account.sell(percentage, price)
+            if filled is not None:
+                trades.append((df.index[i], "sell", percentage, price) + filled)
+        equity[j] = account.value(price)
+
+    index = df.index[rows]
+    result = BacktestResult(
+        equity=pd.Series(equity, index=index, name="equity"),
+        trades=pd.DataFrame(trades, columns=["time", "decision", "percentage", "price", "btc", "krw"]),
+        initial_krw=float(initial_krw),
+        benchmark=pd.Series(initial_krw * prices[rows] / prices[rows[0]] if len(rows) else [], index=index, name="buy_and_hold"),
+        elapsed=time.perf_counter() - start,
+    )
+    logger.info(f"Backtest: {result.summary()}")
+    return result
+
+if __name__ == "__main__":
+    # 사용법: python backtest.py --count 26280 --step 6 --decider rule
+    from candle_store import CandleStore
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="저장된 캔들로 매매 결정 백테스트")
+    parser.add_argument("--interval", default="minute60")
+    parser.add_argument("--count", type=int, default=24 * 365)
+    parser.add_argument("--step", type=int, default=6)
+    parser.add_argument("--decider", choices=["rule", "recorded", "live"], default="rule")
+    parser.add_argument("--llm-cache", choices=["live", "record", "replay"], default="record",
+                        help="live 결정기의 응답 캐시 모드 (record로 한 번 돌린 뒤 replay로 재실행하면 API 호출 없음)")
+    args = parser.parse_args()
+
+    candles = CandleStore().get_ohlcv("KRW-BTC", args.interval, count=args.count)
+    if args.decider == "rule":
+        chosen = RuleDecider()
+    elif args.decider == "recorded":
+        from decision_store import DecisionStore
+        chosen = RecordedDecider.from_store(DecisionStore())
+    else:
+        chosen = live_model_decider(cache_mode=args.llm_cache)
+    run_backtest(candles, chosen, step=args.step)
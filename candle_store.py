@@ -0,0 +1,109 @@
+import logging
+import sqlite3
+import threading
+from contextlib import closing
+from retry_policy import TransientError, get_policy
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'value']
+
+class CandleStore:
+    """
+    한 번 받아온 캔들을 SQLite에 저장해두고, 다음 요청부터는 마지막 저장 봉 이후만 받아와 합칩니다.
+    마지막 저장 봉은 아직 진행 중이었을 수 있으므로 항상 다시 받아 덮어씁니다.
+    """
+
+    def __init__(self, db_path='candles.sqlite'):
+        self.db_path = db_path
+        # (ticker, interval)마다 잠금 - 같은 캔들은 한 번만 받아오고, 다른 간격(일봉 / 60분봉 / 240분봉)은 동시에 받아옴
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS candles (
+                    ticker TEXT,
+                    interval TEXT,
+                    ts INTEGER,
+                    open REAL,
+                    high REAL,
+                    low REAL,
+                    close REAL,
+                    volume REAL,
+                    value REAL,
+                    PRIMARY KEY (ticker, interval, ts)
+                );
+            ''')
+
+    def _lock_for(self, ticker, interval):
+        with self._locks_lock:
+            return self._locks.setdefault((ticker, interval), threading.Lock())
+
+    def _stored_range(self, conn, ticker, interval):
+        return conn.execute(
+            'SELECT COUNT(*), MAX(ts) FROM candles WHERE ticker = ? AND interval = ?', (ticker, interval)
+        ).fetchone()
+
+    def _upsert(self, conn, ticker, interval, df):
+        import pandas as pd
+        timestamps = pd.DatetimeIndex(df.index).as_unit('s').asi8.tolist()
+        rows = [
+            (ticker, interval, ts) + tuple(float(v) for v in values)
+            for ts, values in zip(timestamps, df[OHLCV_COLUMNS].itertuples(index=False, name=None))
+        ]
+        conn.executemany(
+            'INSERT OR REPLACE INTO candles (ticker, interval, ts, open, high, low, close, volume, value) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            rows
+        )
+
+    def load(self, ticker, interval, count):
+        import pandas as pd
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            rows = conn.execute(
+                'SELECT ts, open, high, low, close, volume, value FROM candles WHERE ticker = ? AND interval = ? ORDER BY ts DESC LIMIT ?',
+                (ticker, interval, count)
+            ).fetchall()
+        df = pd.DataFrame(rows[::-1], columns=['ts'] + OHLCV_COLUMNS)
+        df.index = pd.to_datetime(df.pop('ts'), unit='s')
+        df.index.name = None
+        return df
+
+    def _fetch(self, ticker, interval, count):
+        from http_client import get_pyupbit
+
+        def fetch():
+            # pyupbit.get_ohlcv는 오류를 삼키고 None을 반환하므로 일시적 실패로 보고 재시도
+            df = get_pyupbit().get_ohlcv(ticker, interval=interval, count=count)
+            if df is None or df.empty:
+                raise TransientError(f"Failed to fetch OHLCV: {ticker} {interval} count={count}")
+            return df
+        return get_policy("upbit").call(fetch)
+
+    def get_ohlcv(self, ticker, interval, count):
+        """
+        pyupbit.get_ohlcv와 같은 형태의 DataFrame을 반환하되, 저장소에 없는 봉만 요청합니다.
+        """
+        import pandas as pd
+        with self._lock_for(ticker, interval):
+            with closing(sqlite3.connect(self.db_path)) as conn:
+                stored, last_ts = self._stored_range(conn, ticker, interval)
+            # 네트워크 요청(재시도 대기 포함) 동안에는 SQLite 연결을 열어두지 않음
+            if stored < count:
+                # 저장된 봉이 모자라면 요청 개수만큼 한 번에 받아옴
+                df = self._fetch(ticker, interval, count)
+                requests_made = 1
+            else:
+                # 마지막 저장 봉과 겹칠 때까지 요청 개수를 늘려가며 최신 봉만 받아옴
+                fetch_count = 2
+                requests_made = 0
+                while True:
+                    df = self._fetch(ticker, interval, fetch_count)
+                    requests_made += 1
+                    first_ts = pd.DatetimeIndex(df.index[:1]).as_unit('s').asi8[0]
+                    if first_ts <= last_ts or fetch_count >= count:
+                        break
+                    fetch_count = min(fetch_count * 4, count)
+            with closing(sqlite3.connect(self.db_path)) as conn, conn:
+                self._upsert(conn, ticker, interval, df)
+        logger.info(f"Candles {ticker} {interval}: fetched {len(df)} bars in {requests_made} request(s), {stored} cached")
+        return self.load(ticker, interval, count)
@@ -0,0 +1,192 @@
+import io
+import logging
+import threading
+import time
+
+# selenium / webdriver_manager / PIL은 브라우저 차트를 실제로 쓸 때만 불러옴 (시작 시간 단축)
+
+logger = logging.getLogger(__name__)
+
+UPBIT_CHART_URL = "https://upbit.com/full_chart?code=CRIX.UPBIT.KRW-BTC"
+CHART_MENU_XPATH = "//*[@id='fullChartiq']/div/div/div[1]/div/div/cq-menu[{}]"
+
+# 차트 캔버스와 볼린저 밴드 / MACD 패널이 모두 그려졌는지 확인하는 스크립트
+# (지표 메뉴(cq-menu) 항목에도 같은 이름이 있으므로 페이지 글자가 아니라 실제로 그려진 패널 / 범례만 확인)
+INDICATOR_PANES_READY_SCRIPT = """
+var root = document.getElementById('fullChartiq');
+if (!root || root.querySelectorAll('canvas').length === 0) return false;
+function visible(el) { return el.offsetWidth > 0 && el.offsetHeight > 0 && !el.closest('cq-menu, cq-menu-dropdown'); }
+function drawn(selector, name) {
+    return Array.prototype.some.call(root.querySelectorAll(selector), function (el) {
+        return visible(el) && (el.textContent || '').indexOf(name) !== -1;
+    });
+}
+// MACD는 별도 스터디 패널, 볼린저 밴드는 가격 패널 위의 오버레이 범례로 그려짐
+var macdPane = drawn('.stx-holder.stx-panel-study .stx-panel-title', 'MACD');
+var bollingerLegend = drawn('cq-study-legend, .stx-panel-legend, .stx-panel-chart .stx-panel-title', 'Bollinger');
+return macdPane && bollingerLegend;
+"""
+# 연속된 두 스크린샷의 평균 픽셀 차이가 이 값 이하이면 렌더링이 끝난 것으로 판단 (0~255)
+RENDER_STABLE_THRESHOLD = 1.0
+
+def _render_fingerprint(png):
+    from PIL import Image
+    # 실시간 시세로 인한 작은 변화는 무시하도록 축소된 흑백 이미지로 비교
+    return Image.open(io.BytesIO(png)).convert("L").resize((160, 90))
+
+def _fingerprint_diff(a, b):
+    from PIL import ImageChops, ImageStat
+    return ImageStat.Stat(ImageChops.difference(a, b)).mean[0]
+
+class ChartBrowserSession:
+    """
+    지표가 적용된 업비트 차트 페이지를 띄워둔 채로 유지하는 Chrome 세션입니다.
+    매 사이클마다 브라우저를 새로 띄우지 않고, 상태를 확인한 뒤 스크린샷만 찍습니다.
+    페이지가 깨졌거나 세션이 너무 오래되면 브라우저를 다시 시작합니다.
+    """
+
+    def __init__(self, environment, wait_timeout=10, max_age_seconds=24 * 60 * 60,
+                 render_timeout=5.0, render_poll_interval=0.25):
+        self.environment = environment
+        self.wait_timeout = wait_timeout
+        self.max_age_seconds = max_age_seconds
+        self.render_timeout = render_timeout
+        self.render_poll_interval = render_poll_interval
+        self.driver = None
+        self.started_at = None
+        self._driver_path = None
+        self._lock = threading.Lock()
+
+    def _create_driver(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        # 로컬용 / Ec2용 셋팅 - Set up Chrome options for headless mode
+        chrome_options = Options()
+        chrome_options.add_argument("--start-maximized")
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+
+        if self.environment == "local":
+            chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+            # 드라이버 설치 경로는 한 번만 확인
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            service = Service(self._driver_path)
+        elif self.environment == "ec2":
+            service = Service('/usr/bin/chromedriver')
+        else:
+            raise ValueError(f"Unsupported environment. Only local or ec2: {self.environment}")
+
+        return webdriver.Chrome(service=service, options=chrome_options)
+
+    def _apply_chart_settings(self):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        driver = self.driver
+        wait = WebDriverWait(driver, self.wait_timeout)
+
+        # 시간메뉴 -> 4시간
+        wait.until(EC.element_to_be_clickable((By.XPATH, CHART_MENU_XPATH.format(1)))).click()
+        wait.until(EC.element_to_be_clickable((By.XPATH, "//cq-item[@stxtap=\"Layout.setPeriodicity(4,60,'minute')\"]"))).click()
+
+        # 지표메뉴 -> 볼린저 밴드
+        wait.until(EC.element_to_be_clickable((By.XPATH, CHART_MENU_XPATH.format(3)))).click()
+        wait.until(EC.element_to_be_clickable((By.XPATH, "//cq-item[translate[@original='Bollinger Bands']]"))).click()
+
+        # 지표메뉴 -> MACD (목록 중간까지 스크롤해야 보임)
+        wait.until(EC.element_to_be_clickable((By.XPATH, CHART_MENU_XPATH.format(3)))).click()
+        indicators_container = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "cq-scroll.ps-container")))
+        driver.execute_script("arguments[0].scrollTop = arguments[0].scrollHeight / 2.5", indicators_container)
+        wait.until(EC.element_to_be_clickable((By.XPATH, "//cq-item[translate[@original='MACD']]"))).click()
+        self.wait_for_render()
+
+    def wait_for_render(self):
+        """
+        고정 대기 대신, 지표 패널이 생기고 화면 픽셀 변화가 멈출 때까지 폴링합니다.
+        Returns:
+        - bytes or None: 마지막으로 찍은 스크린샷 PNG (렌더링 확인 전이면 None)
+        """
+        start = time.perf_counter()
+        deadline = start + self.render_timeout
+        previous = None
+        png = None
+        while time.perf_counter() < deadline:
+            if self.driver.execute_script(INDICATOR_PANES_READY_SCRIPT):
+                png = self.driver.get_screenshot_as_png()
+                fingerprint = _render_fingerprint(png)
+                if previous is not None and _fingerprint_diff(previous, fingerprint) <= RENDER_STABLE_THRESHOLD:
+                    logger.info(f"차트 렌더링 완료 ({time.perf_counter() - start:.2f}s)")
+                    return png
+                previous = fingerprint
+            time.sleep(self.render_poll_interval)
+        logger.warning(f"차트 렌더링 대기 시간 초과 ({self.render_timeout:.1f}s), 현재 화면으로 진행합니다.")
+        return png
+
+    def start(self):
+        logger.info("ChromeDriver 설정 중...")
+        start = time.perf_counter()
+        self.driver = self._create_driver()
+        try:
+            self.driver.get(UPBIT_CHART_URL)
+            logger.info("페이지 로드 완료")
+            self._apply_chart_settings()
+        except Exception:
+            self.close()
+            raise
+        self.started_at = time.time()
+        logger.info(f"차트 세션 준비 완료 ({time.perf_counter() - start:.2f}s)")
+
+    def close(self):
+        if self.driver is not None:
+            from selenium.common.exceptions import WebDriverException
+            try:
+                self.driver.quit()
+            except WebDriverException as e:
+                logger.warning(f"브라우저 종료 중 오류 발생: {e}")
+        self.driver = None
+        self.started_at = None
+
+    def is_healthy(self):
+        from selenium.common.exceptions import WebDriverException
+        if self.driver is None or self.started_at is None:
+            return False
+        if time.time() - self.started_at > self.max_age_seconds:
+            logger.info("차트 세션이 오래되어 재시작합니다.")
+            return False
+        try:
+            # 페이지가 살아있고 차트 영역이 그대로 남아있는지 확인
+            return bool(self.driver.execute_script(
+                "return document.readyState === 'complete' && document.getElementById('fullChartiq') !== null;"
+            ))
+        except WebDriverException as e:
+            logger.warning(f"차트 세션 상태 확인 실패: {e}")
+            return False
+
+    def _ensure_ready(self):
+        if not self.is_healthy():
+            self.close()
+            self.start()
+
+    def warm_up(self):
+        with self._lock:
+            self._ensure_ready()
+
+    def get_screenshot_png(self):
+        from selenium.common.exceptions import WebDriverException
+        with self._lock:
+            self._ensure_ready()
+            try:
+                return self.driver.get_screenshot_as_png()
+            except WebDriverException as e:
+                # 스크린샷 도중 세션이 끊긴 경우 한 번만 다시 연결
+                logger.warning(f"스크린샷 실패, 차트 세션 재연결: {e}")
+                self.close()
+                self.start()
+                return self.driver.get_screenshot_as_png()
@@ -0,0 +1,117 @@
+import io
+import math
+
+# 색상 설정 (업비트 차트와 비슷한 배색)
+BACKGROUND = (255, 255, 255)
+GRID = (235, 235, 235)
+TEXT = (60, 60, 60)
+UP = (200, 40, 40)        # 상승 캔들 (빨강)
+DOWN = (30, 90, 200)      # 하락 캔들 (파랑)
+BAND = (120, 120, 220)
+MIDDLE_BAND = (230, 150, 40)
+MACD_LINE = (30, 90, 200)
+SIGNAL_LINE = (230, 150, 40)
+
+PRICE_PANE_RATIO = 0.68   # 전체 높이 중 가격 패널 비율
+MARGIN_RIGHT = 110        # 가격 라벨 영역
+MARGIN = 10
+
+def _is_number(value):
+    return value is not None and not (isinstance(value, float) and math.isnan(value))
+
+def _value_range(columns):
+    values = [v for column in columns for v in column if _is_number(v)]
+    low, high = min(values), max(values)
+    if high == low:
+        high, low = high + 1, low - 1
+    return low, high
+
+def _draw_line(draw, xs, values, to_y, color):
+    # NaN 구간(지표 워밍업)은 선을 끊어서 그림
+    segment = []
+    for x, value in zip(xs, values):
+        if _is_number(value):
+            segment.append((x, to_y(value)))
+        else:
+            if len(segment) > 1:
+                draw.line(segment, fill=color, width=2)
+            segment = []
+    if len(segment) > 1:
+        draw.line(segment, fill=color, width=2)
+
+def _draw_grid(draw, left, right, low, high, to_y, font, steps=4):
+    for i in range(steps + 1):
+        value = low + (high - low) * i / steps
+        y = to_y(value)
+        draw.line([(left, y), (right, y)], fill=GRID)
+        draw.text((right + 8, y - 6), f"{value:,.0f}", fill=TEXT, font=font)
+
+def render_chart_png(df, width=1280, height=800, title="KRW-BTC 4H"):
+    """
+    OHLCV + 지표 DataFrame으로 캔들 차트(볼린저 밴드)와 MACD 패널을 PNG로 그립니다.
+    브라우저 없이 동작하며 같은 입력에 대해 항상 같은 이미지를 만듭니다.
+    Parameters:
+    - df (DataFrame): open/high/low/close, Upper_Band/Middle_Band/Lower_Band,
+      MACD/Signal_Line/MACD_Histogram 컬럼을 가진 DataFrame
+    - width, height (int): 이미지 크기 (px)
+    - title (str): 좌측 상단에 표시할 제목
+    Returns:
+    - bytes: PNG 이미지
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    image = Image.new("RGB", (width, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+
+    n = len(df)
+    left, right = MARGIN, width - MARGIN_RIGHT
+    price_top, price_bottom = MARGIN + 20, int(height * PRICE_PANE_RATIO)
+    macd_top, macd_bottom = price_bottom + 20, height - MARGIN - 20
+    step = (right - left) / max(n, 1)
+    body_width = max(1.0, step * 0.35)
+    xs = [left + step * (i + 0.5) for i in range(n)]
+
+    opens, highs, lows, closes = (df[c].tolist() for c in ("open", "high", "low", "close"))
+    upper, middle, lower = (df[c].tolist() for c in ("Upper_Band", "Middle_Band", "Lower_Band"))
+    macd, signal, histogram = (df[c].tolist() for c in ("MACD", "Signal_Line", "MACD_Histogram"))
+
+    # 가격 패널
+    price_low, price_high = _value_range([lows, highs, upper, lower])
+    def price_y(value):
+        return price_bottom - (value - price_low) / (price_high - price_low) * (price_bottom - price_top)
+    _draw_grid(draw, left, right, price_low, price_high, price_y, font)
+
+    _draw_line(draw, xs, upper, price_y, BAND)
+    _draw_line(draw, xs, lower, price_y, BAND)
+    _draw_line(draw, xs, middle, price_y, MIDDLE_BAND)
+
+    for x, o, h, l, c in zip(xs, opens, highs, lows, closes):
+        color = UP if c >= o else DOWN
+        draw.line([(x, price_y(h)), (x, price_y(l))], fill=color)
+        body_top, body_bottom = sorted((price_y(o), price_y(c)))
+        draw.rectangle([x - body_width, body_top, x + body_width, max(body_bottom, body_top + 1)], fill=color)
+
+    # MACD 패널
+    macd_low, macd_high = _value_range([macd, signal, histogram])
+    def macd_y(value):
+        return macd_bottom - (value - macd_low) / (macd_high - macd_low) * (macd_bottom - macd_top)
+    _draw_grid(draw, left, right, macd_low, macd_high, macd_y, font, steps=2)
+
+    zero_y = macd_y(0) if macd_low <= 0 <= macd_high else macd_bottom
+    for x, value in zip(xs, histogram):
+        if _is_number(value):
+            y0, y1 = sorted((zero_y, macd_y(value)))
+            draw.rectangle([x - body_width, y0, x + body_width, y1], fill=UP if value >= 0 else DOWN)
+    _draw_line(draw, xs, macd, macd_y, MACD_LINE)
+    _draw_line(draw, xs, signal, macd_y, SIGNAL_LINE)
+
+    # 라벨
+    draw.text((left, MARGIN), f"{title}  BB(20, 2)", fill=TEXT, font=font)
+    draw.text((left, price_bottom + 4), "MACD(12, 26, 9)", fill=TEXT, font=font)
+    if n:
+        draw.text((left, height - MARGIN - 12), str(df.index[0]), fill=TEXT, font=font)
+        draw.text((right - 120, height - MARGIN - 12), str(df.index[-1]), fill=TEXT, font=font)
+
+    buffered = io.BytesIO()
+    image.save(buffered, format="PNG")
+    return buffered.getvalue()
@@ -0,0 +1,91 @@
+import json
+import logging
+import re
+from enum import Enum
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+logger = logging.getLogger(__name__)
+
+class DecisionType(str, Enum):
+    buy = "buy"
+    sell = "sell"
+    hold = "hold"
+
+class TradingDecision(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    decision: DecisionType
+    percentage: int = Field(ge=0, le=100)
+    reason: str
+
+def hold_decision(reason):
+    """모델 응답 없이 이번 사이클을 보류할 때 쓰는 결정"""
+    return TradingDecision(decision=DecisionType.hold, percentage=0, reason=reason)
+
+def response_format():
+    """TradingDecision 스키마를 강제하는 structured output 설정 (strict json_schema)"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "trading_decision",
+            "strict": True,
+            "schema": TradingDecision.model_json_schema(),
+        },
+    }
+
+def _extract_object(text):
+    # 코드 블록 / 앞뒤 설명이 붙은 응답에서 첫 JSON 객체만 꺼냄
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("no JSON object in response")
+    return json.loads(text[start:end + 1])
+
+def _repair(data):
+    data = {str(key).strip().lower(): value for key, value in data.items()}
+    decision = str(data.get("decision", "")).strip().lower()
+    reason = str(data.get("reason") or "")
+    percentage = _repair_percentage(data.get("percentage"))
+    if percentage is None:
+        if decision in ("buy", "sell"):
+            # 매매 비율을 임의로 정하지 않음 (100으로 채우면 매도 시 전량 청산) - 이번 사이클은 hold
+            logger.warning(f"Invalid percentage {data.get('percentage')!r} for {decision}, downgrading to hold")
+            return {"decision": "hold", "percentage": 0,
+                    "reason": f"[downgraded from {decision}: invalid percentage] {reason}".strip()}
+        percentage = 0
+    return {"decision": decision, "percentage": percentage, "reason": reason}
+
+def _repair_percentage(value):
+    # "30%", "30.0", 30.4 같은 값만 정수로 고치고, 없거나 0~100 범위를 벗어나면 None
+    if isinstance(value, str):
+        match = re.fullmatch(r"\s*(\d+(\.\d+)?)\s*%?\s*", value)
+        value = float(match.group(1)) if match else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+        return None
+    return int(round(value))
+
+def normalize_decision(advice):
+    """parse_decision 결과를 정규화한 JSON 문자열로 반환 (고칠 수 없으면 None) - LLM 캐시 저장용"""
+    decision = parse_decision(advice)
+    return decision.model_dump_json() if decision is not None else None
+
+def parse_decision(advice):
+    """
+    모델 응답을 TradingDecision으로 검증하고, 형식이 조금 어긋난 응답은 다시 요청하지 않고 로컬에서 고칩니다.
+    (코드 블록으로 감싼 JSON, 대소문자가 다른 키 / 결정, "30%" 같은 문자열 비율, 추가 필드)
+    buy / sell의 비율이 없거나 0~100 범위를 벗어나면 비율을 지어내지 않고 hold로 바꿉니다.
+    Returns:
+    - TradingDecision or None: 고칠 수 없으면 None
+    """
+    if not advice:
+        return None
+    try:
+        return TradingDecision.model_validate_json(advice)
+    except ValidationError:
+        pass
+    try:
+        decision = TradingDecision.model_validate(_repair(_extract_object(advice)))
+        logger.warning(f"Model response repaired locally: {decision.model_dump_json()}")
+        return decision
+    except (ValueError, TypeError, ValidationError) as e:
+        logger.error(f"Unrepairable model response: {e}")
+        return None
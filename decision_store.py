@@ -0,0 +1,124 @@
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DECISION_FIELDS = [
+    'decision', 'percentage', 'reason', 'btc_balance', 'krw_balance', 'btc_avg_buy_price',
+    'btc_krw_price', 'btc_krw_balance', 'total_krw_balance',
+]
+
+INSERT_DECISION = f'''
+    INSERT INTO decisions (ts, timestamp, {", ".join(DECISION_FIELDS)})
+    VALUES (?, ?, {", ".join("?" for _ in DECISION_FIELDS)})
+'''
+SELECT_LAST = f'SELECT ts, {", ".join(DECISION_FIELDS)} FROM decisions ORDER BY ts DESC LIMIT ?'
+
+# 스키마 버전별 마이그레이션 (PRAGMA user_version 기준으로 순서대로 적용)
+MIGRATIONS = {
+    # 1: 기존 봇들이 만들던 원래 테이블
+    1: ['''
+        CREATE TABLE IF NOT EXISTS decisions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp DATETIME,
+            decision TEXT,
+            percentage REAL,
+            reason TEXT,
+            btc_balance REAL,
+            krw_balance REAL,
+            btc_avg_buy_price REAL,
+            btc_krw_price REAL,
+            btc_krw_balance REAL,
+            total_krw_balance REAL
+        )
+    '''],
+    # 2: 정수 epoch 컬럼 + 인덱스. 텍스트 timestamp(로컬 시각)는 대시보드 호환을 위해 유지하고,
+    #    timestamp만 넣는 기존 스크립트의 행은 트리거가 ts를 채움
+    2: [
+        'ALTER TABLE decisions ADD COLUMN ts INTEGER',
+        "UPDATE decisions SET ts = CAST(strftime('%s', timestamp, 'utc') AS INTEGER) WHERE ts IS NULL",
+        'CREATE INDEX IF NOT EXISTS idx_decisions_ts ON decisions (ts)',
+        '''
+        CREATE TRIGGER IF NOT EXISTS decisions_fill_ts AFTER INSERT ON decisions
+        WHEN NEW.ts IS NULL
+        BEGIN
+            UPDATE decisions SET ts = CAST(strftime('%s', NEW.timestamp, 'utc') AS INTEGER) WHERE id = NEW.id;
+        END
+        ''',
+    ],
+}
+SCHEMA_VERSION = max(MIGRATIONS)
+
+class DecisionStore:
+    """
+    매매 결정 기록용 SQLite 저장소입니다.
+    - 연결 하나를 계속 열어두고 (WAL 모드, synchronous=NORMAL) 고정 SQL 문은 sqlite3 문장 캐시로 재사용
+    - 정수 epoch(ts) 인덱스로 최근 N개 조회가 테이블 크기와 무관하게 일정한 시간에 끝남
+    - 열 때 PRAGMA user_version을 보고 필요한 마이그레이션만 적용
+    """
+
+    def __init__(self, db_path='trading_decisions.sqlite'):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # 수집 스레드와 메인 스레드가 함께 쓰므로 스레드 검사 대신 락으로 보호
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=64)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.migrate()
+
+    def migrate(self):
+        with self._lock:
+            (version,) = self.conn.execute('PRAGMA user_version').fetchone()
+            if version == 0 and self._has_column('ts'):
+                version = SCHEMA_VERSION
+            for target in sorted(v for v in MIGRATIONS if v > version):
+                with self.conn:
+                    for statement in MIGRATIONS[target]:
+                        if statement.startswith('ALTER TABLE') and self._has_column('ts'):
+                            continue
+                        self.conn.execute(statement)
+                    self.conn.execute(f'PRAGMA user_version = {target}')
+                logger.info(f"Decision store migrated to schema version {target}")
+
+    def _has_column(self, name):
+        return any(row[1] == name for row in self.conn.execute('PRAGMA table_info(decisions)'))
+
+    def save(self, decision, status, ts=None):
+        """
+        Parameters:
+        - decision (dict): 'decision', 'percentage', 'reason'
+        - status (dict): get_current_status의 잔고 / 가격 정보
+        - ts (float): 기록 시각 (epoch 초, 기본값 현재)
+        """
+        ts = int(time.time() if ts is None else ts)
+        row = (
+            ts,
+            datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"),  # 기존과 같은 로컬 시각 문자열
+            decision.get('decision'),
+            decision.get('percentage', 100),  # Defaulting to 100 if not provided
+            decision.get('reason', ''),  # Defaulting to an empty string if not provided
+            status.get('btc_balance'),
+            status.get('krw_balance'),
+            status.get('btc_avg_buy_price'),
+            status.get('btc_krw_price'),
+            status.get('btc_krw_balance'),
+            status.get('total_krw_balance'),
+        )
+        with self._lock, self.conn:
+            self.conn.execute(INSERT_DECISION, row)
+
+    def last(self, limit=10):
+        """최근 limit개의 결정 (최신순, timestamp는 epoch 밀리초)"""
+        with self._lock:
+            rows = self.conn.execute(SELECT_LAST, (limit,)).fetchall()
+        return [
+            dict(zip(['timestamp'] + DECISION_FIELDS, (row[0] * 1000,) + row[1:]))
+            for row in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
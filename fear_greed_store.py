@@ -0,0 +1,101 @@
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from retry_policy import get_policy
+
+logger = logging.getLogger(__name__)
+
+FNG_URL = "https://api.alternative.me/fng/"
+DAY_SECONDS = 24 * 60 * 60
+
+class FearGreedStore:
+    """
+    공포 탐욕 지수를 날짜(일 단위 timestamp)별로 SQLite에 저장해두고, 저장된 마지막 날짜 이후 값만 받아옵니다.
+    지수는 하루에 한 번(UTC 0시) 갱신되므로 다음 값이 나올 때까지는 네트워크 요청 없이 저장된 값을 씁니다.
+    같은 limit 요청은 ttl_seconds 동안 메모리에 만들어 둔 문자열을 그대로 반환합니다.
+    """
+
+    def __init__(self, db_path='fear_greed.sqlite', ttl_seconds=60 * 60):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._memory = {}  # limit -> (만든 시각, 포맷된 문자열)
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS fear_greed (
+                    ts INTEGER PRIMARY KEY,
+                    value INTEGER,
+                    classification TEXT
+                );
+            ''')
+
+    def _fetch(self, limit):
+        from http_client import get_session
+        response = get_session("fear_and_greed").get(FNG_URL, params={'limit': limit, 'format': 'json'})
+        response.raise_for_status()
+        return [
+            (int(data['timestamp']), int(data['value']), data['value_classification'])
+            for data in response.json()['data']
+        ]
+
+    def _missing_days(self, conn, limit, now):
+        stored, last_ts = conn.execute('SELECT COUNT(*), MAX(ts) FROM fear_greed').fetchone()
+        if stored == 0:
+            return limit
+        # 오늘 값이 이미 저장되어 있으면 0, 아니면 마지막 저장일부터 오늘까지 (마지막 저장일은 겹치는지 확인용)
+        missing = 0 if now < last_ts + DAY_SECONDS else int((now - last_ts) // DAY_SECONDS) + 1
+        if stored + max(missing - 1, 0) < limit:
+            # 새로 받을 날짜를 더해도 요청 기간이 모자라면 전체를 한 번에 받아옴
+            return limit
+        return min(limit, missing)
+
+    def load(self, limit):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            return conn.execute(
+                'SELECT ts, value, classification FROM fear_greed ORDER BY ts DESC LIMIT ?', (limit,)
+            ).fetchall()
+
+    def get_series(self, limit=30):
+        """
+        최근 limit일의 지수를 최신순 한 줄씩 "YYYY-MM-DD value classification" 형식으로 반환합니다.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(limit)
+            if cached is not None and now - cached[0] < self.ttl_seconds:
+                return cached[1]
+
+            with closing(sqlite3.connect(self.db_path)) as conn:
+                missing = self._missing_days(conn, limit, now)
+            fetch_failed = False
+            if missing:
+                try:
+                    rows = get_policy("fear_and_greed").call(self._fetch, missing)
+                except Exception as e:
+                    # 받아오지 못해도 저장된 날짜로 진행 (저장된 값이 없으면 예외를 그대로 올림)
+                    stored = self.load(limit)
+                    if not stored:
+                        raise
+                    logger.warning(f"Error fetching fear and greed index, using {len(stored)} stored day(s): {e}")
+                    fetch_failed = True
+                else:
+                    with closing(sqlite3.connect(self.db_path)) as conn, conn:
+                        conn.executemany(
+                            'INSERT OR REPLACE INTO fear_greed (ts, value, classification) VALUES (?, ?, ?)', rows
+                        )
+                    logger.info(f"Fear and greed: fetched {missing} day(s)")
+            else:
+                logger.info("Fear and greed: served from local store")
+
+            series = "\n".join(
+                f"{datetime.fromtimestamp(ts, timezone.utc):%Y-%m-%d} {value} {classification}"
+                for ts, value, classification in self.load(limit)
+            )
+            if fetch_failed:
+                # 메모리에 남기지 않아 다음 사이클에 다시 받아봄
+                return series
+            self._memory[limit] = (now, series)
+            return series
@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from retry_policy import is_retryable
+
+logger = logging.getLogger(__name__)
+
+class DeadlineExceeded(TimeoutError):
+    """시간 상한 안에 유효한 응답이 하나도 오지 않음"""
+
+class LatencyTracker:
+    """
+    최근 응답 시간(초)을 보관하고 지정한 백분위 값을 돌려줍니다.
+    표본이 min_samples보다 적으면 default를 사용합니다.
+    """
+
+    def __init__(self, percentile=0.9, window=50, min_samples=5, default=30.0):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.default = default
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def threshold(self):
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return self.default
+        return samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+
+def hedged_call(primary, hedge=None, hedge_after=None, deadline=None, validate=None, tracker=None):
+    """
+    primary()를 먼저 보내고, hedge_after초 안에 유효한 응답이 없으면 hedge()를 추가로 보내 먼저 도착한 유효한 응답을 사용합니다.
+    늦게 끝나는 요청은 기다리지 않습니다.
+    tracker에는 primary의 소요 시간을 한 번씩 기록합니다 - 실패한 경우와, 응답 전에 끝난 경우(hedge 승리 / 시간 상한)의
+    그때까지 경과 시간(하한값)도 넣어 느린 요청이 백분위에서 빠지지 않도록 합니다.
+    Parameters:
+    - primary (callable): 인자 없이 호출하는 기본 요청
+    - hedge (callable): 추가 요청 (None이면 primary를 한 번 더 보냄)
+    - hedge_after (float): 추가 요청을 보낼 때까지 기다릴 시간(초), 기본값 tracker.threshold()
+    - deadline (float): 전체 시간 상한(초), None이면 제한 없음
+    - validate (callable): 응답이 유효한지 판단하는 함수 (False를 반환하거나 예외가 나면 다른 요청을 계속 기다림)
+    - tracker (LatencyTracker): primary 응답 시간 기록용
+    Returns:
+    - tuple: (응답, "primary" 또는 "hedge")
+    Raises:
+    - DeadlineExceeded: 상한 안에 유효한 응답이 없을 때
+    - primary가 재시도해도 소용없는 오류(인증 / 잘못된 요청)로 실패하면 hedge를 보내지 않고 그 예외
+    - 모든 요청이 상한 전에 실패하면 마지막 예외 (응답이 모두 유효하지 않았으면 ValueError)
+    """
+    if hedge_after is None:
+        hedge_after = tracker.threshold() if tracker is not None else float("inf")
+    start = time.monotonic()
+    end = start + deadline if deadline is not None else float("inf")
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hedge")
+    recorded = []
+    record_lock = threading.Lock()
+
+    def record_primary():
+        # primary 소요 시간은 한 번만 기록 (응답 / 실패 시점, 또는 기다리지 않고 끝낸 시점)
+        with record_lock:
+            if tracker is not None and not recorded:
+                recorded.append(True)
+                tracker.record(time.monotonic() - start)
+
+    def timed(func, label):
+        def run():
+            try:
+                return func()
+            finally:
+                if label == "primary":
+                    record_primary()
+        return run
+
+    pending = {executor.submit(timed(primary, "primary")): "primary"}
+    hedged = False
+    last_error = None
+    try:
+        while pending:
+            now = time.monotonic()
+            if now >= end:
+                break
+            wait_until = end if hedged else min(end, start + hedge_after)
+            done, _ = wait(pending, timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                label = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    logger.warning(f"Hedged request: {label} failed ({type(e).__name__}: {e})")
+                    if label == "primary" and not hedged and not is_retryable(e):
+                        # 인증 / 잘못된 요청 오류는 같은 요청을 한 번 더 보내도 실패하므로 hedge하지 않음
+                        raise
+                    continue
+                try:
+                    valid = validate is None or validate(result)
+                except Exception as e:
+                    valid = False
+                    logger.warning(f"Hedged request: {label} response failed validation ({e})")
+                if valid:
+                    logger.info(f" ## Hedged request: {label} answered in {time.monotonic() - start:.2f}s"
+                                f"{' (hedge sent)' if hedged else ''}")
+                    return result, label
+                logger.warning(f"Hedged request: invalid {label} response")
+            if not hedged and (not pending or time.monotonic() >= start + hedge_after):
+                # 기준 시간을 넘겼거나 기본 요청이 유효한 응답 없이 끝나면 추가 요청
+                hedged = True
+                logger.info(f"Hedged request: no valid answer after {time.monotonic() - start:.2f}s "
+                            f"(threshold {hedge_after:.2f}s), sending hedge")
+                pending[executor.submit(timed(hedge or primary, "hedge"))] = "hedge"
+    finally:
+        # 아직 응답하지 않은 primary는 지금까지의 경과 시간(하한값)으로 기록
+        record_primary()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    if pending:
+        raise DeadlineExceeded(f"No valid response within {deadline:.0f}s")
+    if last_error is not None:
+        raise last_error
+    raise ValueError("No valid response from primary or hedge request")
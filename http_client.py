@@ -0,0 +1,134 @@
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# (연결, 응답 읽기) 제한 시간 - 호출하는 쪽에서 timeout을 주지 않았을 때 사용
+DEFAULT_TIMEOUT = (3.05, 10)
+POOL_MAXSIZE = 10  # 수집 단계에서 동시에 쓰는 스레드 수보다 넉넉하게
+# 재시도는 retry_policy가 오류 분류 / Retry-After / 시간 상한을 보고 호출 단위로 처리하므로 연결 계층에서는 재시도하지 않음
+# (두 계층이 모두 재시도하면 시도 횟수와 대기 시간이 곱해짐)
+RETRY_POLICY = Retry(total=0, read=False)
+
+_stats = {"opened": 0, "reused": 0}
+_stats_lock = threading.Lock()
+_sessions = {}
+_sessions_lock = threading.Lock()
+_pyupbit_installed = False
+
+def _count(key):
+    with _stats_lock:
+        _stats[key] += 1
+
+class _CountingPoolMixin:
+    """풀에서 꺼낸 연결이 이미 열려 있으면 재사용, 아니면 새 연결(TCP/TLS 핸드셰이크)로 집계합니다."""
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout=timeout)
+        connected = getattr(conn, "is_connected", getattr(conn, "sock", None) is not None)
+        _count("reused" if connected else "opened")
+        return conn
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    pass
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    pass
+
+class PooledAdapter(HTTPAdapter):
+    """keep-alive 연결 풀과 재시도 정책을 가진 어댑터 (연결 재사용 집계 포함)"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("pool_connections", POOL_MAXSIZE)
+        kwargs.setdefault("pool_maxsize", POOL_MAXSIZE)
+        kwargs.setdefault("max_retries", RETRY_POLICY)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+class PooledSession(requests.Session):
+    """timeout을 지정하지 않은 요청에 DEFAULT_TIMEOUT을 적용하는 세션"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+        adapter = PooledAdapter()
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().request(method, url, **kwargs)
+
+def get_session(name="default"):
+    """
+    서비스별로 하나씩 유지되는 공용 세션을 반환합니다.
+    서비스마다 세션을 나누는 이유는 Tavily처럼 세션 헤더에 인증 정보를 넣는 클라이언트가 있어서입니다.
+    Parameters:
+    - name (str): 서비스 이름 (예: 'upbit', 'tavily', 'fear_and_greed')
+    Returns:
+    - PooledSession
+    """
+    with _sessions_lock:
+        if name not in _sessions:
+            _sessions[name] = PooledSession()
+        return _sessions[name]
+
+class _SessionRequests:
+    """pyupbit.request_api의 requests 모듈 대신 쓰는 객체 - get/post/delete만 공용 세션으로 보냄"""
+
+    def __init__(self, session):
+        self._session = session
+
+    def get(self, url, **kwargs):
+        return self._session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self._session.post(url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self._session.delete(url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+def get_pyupbit():
+    """
+    pyupbit의 모든 REST 호출(시세 / 호가 / 캔들 / 주문)이 공용 'upbit' 세션을 쓰도록 설정한 뒤 pyupbit 모듈을 반환합니다.
+    pyupbit는 매 호출마다 requests.get/post를 직접 부르므로 내부 request_api 모듈의 requests를 바꿔 끼웁니다.
+    """
+    global _pyupbit_installed
+    import pyupbit
+    import pyupbit.request_api
+    with _sessions_lock:
+        if not _pyupbit_installed:
+            pyupbit.request_api.requests = _SessionRequests(_sessions.setdefault("upbit", PooledSession()))
+            _pyupbit_installed = True
+    return pyupbit
+
+def connection_stats():
+    """
+    Returns:
+    - dict: 'opened' (새로 연 연결 수), 'reused' (keep-alive로 재사용한 연결 수)
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+def log_connection_stats(since=None):
+    """since(이전 connection_stats 결과) 이후의 연결 재사용 현황을 로그로 남기고 현재 값을 반환합니다."""
+    current = connection_stats()
+    since = since or {"opened": 0, "reused": 0}
+    opened = current["opened"] - since["opened"]
+    reused = current["reused"] - since["reused"]
+    logger.info(f" ## HTTP connections: opened={opened}, reused={reused}")
+    return current
@@ -0,0 +1,117 @@
+import base64
+import io
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {
+    "PNG": "image/png",
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp",
+}
+
+# 크기 비교용 기본 변형 - 이름: encode_image 옵션
+DEFAULT_VARIANTS = {
+    "png_2000": {"max_size": (2000, 2000), "image_format": "PNG"},
+    "png_1280_64c": {"max_size": (1280, 1280), "image_format": "PNG", "palette_colors": 64},
+    "jpeg_1280_q75": {"max_size": (1280, 1280), "image_format": "JPEG", "quality": 75},
+    "webp_1280_q80": {"max_size": (1280, 1280), "image_format": "WEBP", "quality": 80},
+    "webp_1024_q70": {"max_size": (1024, 1024), "image_format": "WEBP", "quality": 70},
+    "auto_1280_64c": {"max_size": (1280, 1280), "image_format": "AUTO", "quality": 80, "palette_colors": 64},
+}
+
+# image_format="AUTO"일 때 비교할 포맷 (같은 크기 / 잘라낸 영역에서 가장 작은 결과를 사용)
+AUTO_FORMATS = ("PNG", "WEBP", "JPEG")
+
+def image_mime_type(image_format):
+    return MIME_TYPES[image_format.upper()]
+
+def detect_image_format(data):
+    """이미지 바이트(또는 base64 문자열)의 앞부분으로 포맷을 판별 - AUTO로 인코딩한 결과의 data URL용"""
+    if isinstance(data, str):
+        data = base64.b64decode(data[:24])
+    if data.startswith(b"\x89PNG"):
+        return "PNG"
+    if data.startswith(b"\xff\xd8"):
+        return "JPEG"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "WEBP"
+    raise ValueError("Unknown image format")
+
+def _trim_background(img):
+    from PIL import Image, ImageChops
+    # 좌상단 픽셀과 같은 색의 여백을 잘라 차트 영역만 남김
+    rgb = img.convert("RGB")
+    background = Image.new("RGB", rgb.size, rgb.getpixel((0, 0)))
+    bbox = ImageChops.difference(rgb, background).getbbox()
+    return img.crop(bbox) if bbox else img
+
+def _save(img, image_format, quality, palette_colors):
+    buffered = io.BytesIO()
+    if image_format == "PNG":
+        if palette_colors:
+            img = img.convert("RGB").quantize(colors=palette_colors)
+        img.save(buffered, format="PNG", optimize=True)
+    elif image_format == "JPEG":
+        img.convert("RGB").save(buffered, format="JPEG", quality=quality, optimize=True)
+    elif image_format == "WEBP":
+        img.convert("RGB").save(buffered, format="WEBP", quality=quality, method=4)
+    else:
+        raise ValueError(f"Unsupported image format: {image_format}")
+    return buffered.getvalue()
+
+def encode_image_bytes(png, max_size=(2000, 2000), image_format="PNG", quality=80,
+                       crop_box=None, auto_crop=False, palette_colors=None):
+    """
+    PNG 이미지를 비전 모델 전송용으로 줄이고 다시 인코딩합니다.
+    Parameters:
+    - png (bytes): 원본 PNG 이미지
+    - max_size (tuple): 최대 (가로, 세로) 크기, 비율은 유지
+    - image_format (str): 'PNG', 'JPEG', 'WEBP' 또는 'AUTO' (AUTO_FORMATS 중 가장 작은 결과)
+    - quality (int): JPEG/WEBP 품질 (1~100)
+    - crop_box (tuple): 잘라낼 영역 (left, top, right, bottom), 없으면 전체
+    - auto_crop (bool): 단색 여백을 자동으로 잘라낼지 여부
+    - palette_colors (int): 지정하면 해당 색 수로 팔레트를 줄임 (PNG 전용)
+    Returns:
+    - bytes: 인코딩된 이미지 (포맷은 detect_image_format으로 확인)
+    """
+    from PIL import Image
+    image_format = image_format.upper()
+    img = Image.open(io.BytesIO(png))
+    if crop_box:
+        img = img.crop(crop_box)
+    if auto_crop:
+        img = _trim_background(img)
+
+    img.thumbnail(max_size)
+
+    if image_format == "AUTO":
+        # 단색 면이 많은 렌더링 차트는 팔레트 PNG, 그라데이션이 많은 브라우저 스크린샷은 WEBP / JPEG가 작음
+        return min((_save(img, name, quality, palette_colors) for name in AUTO_FORMATS), key=len)
+    return _save(img, image_format, quality, palette_colors)
+
+def encode_image(png, **options):
+    """encode_image_bytes 결과를 base64 문자열로 반환합니다."""
+    encoded = encode_image_bytes(png, **options)
+    logger.info(f"차트 이미지 인코딩: {len(png):,} bytes -> {len(encoded):,} bytes ({detect_image_format(encoded)})")
+    return base64.b64encode(encoded).decode('utf-8')
+
+def compare_encodings(png, variants=DEFAULT_VARIANTS):
+    """
+    같은 이미지를 여러 설정으로 인코딩해 base64 전송 크기를 비교합니다.
+    Returns:
+    - dict: 변형 이름 -> base64 인코딩 후 바이트 수
+    """
+    sizes = {"original": len(base64.b64encode(png))}
+    for name, options in variants.items():
+        sizes[name] = len(base64.b64encode(encode_image_bytes(png, **options)))
+    for name, size in sizes.items():
+        logger.info(f"{name:>16}: {size:>10,} bytes ({size / sizes['original']:.1%})")
+    return sizes
+
+if __name__ == "__main__":
+    # 사용법: python image_encoding.py chart.png
+    logging.basicConfig(level=logging.INFO)
+    with open(sys.argv[1], "rb") as file:
+        compare_encodings(file.read())
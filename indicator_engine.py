@@ -0,0 +1,253 @@
+import copy
+import logging
+import math
+import sys
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+NAN = float('nan')
+
+# add_indicators와 같은 컬럼 이름
+INDICATOR_COLUMNS = [
+    'SMA_7', 'EMA_7', 'EMA_14', 'EMA_35', 'RSI_14',
+    'STOCHk_14_3_3', 'STOCHd_14_3_3',
+    'MACD', 'Signal_Line', 'MACD_Histogram',
+    'Middle_Band', 'Upper_Band', 'Lower_Band',
+]
+
+def _is_nan(value):
+    return value != value
+
+class RollingMean:
+    """최근 length개 값의 평균 (앞쪽 NaN은 건너뜀) - pandas rolling(length).mean()"""
+
+    def __init__(self, length):
+        self.length = length
+        self.window = deque()
+        self.total = 0.0
+
+    def update(self, x):
+        if _is_nan(x):
+            return NAN
+        self.window.append(x)
+        self.total += x
+        if len(self.window) > self.length:
+            self.total -= self.window.popleft()
+        return self.total / self.length if len(self.window) == self.length else NAN
+
+class RollingStd:
+    """최근 length개 값의 평균과 표본 표준편차 - 창을 밀면서 평균 / 제곱합(M2)을 갱신 (Welford)"""
+
+    def __init__(self, length):
+        self.length = length
+        self.window = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+        self.window.append(x)
+        if len(self.window) > self.length:
+            old = self.window.popleft()
+            old_mean = self.mean
+            self.mean += (x - old) / self.length
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        else:
+            n = len(self.window)
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        if len(self.window) < self.length:
+            return NAN, NAN
+        return self.mean, math.sqrt(max(self.m2, 0.0) / (self.length - 1))
+
+class RollingExtreme:
+    """최근 length개 값의 최솟값 / 최댓값 - 단조 덱으로 봉당 상각 O(1)"""
+
+    def __init__(self, length, is_max):
+        self.length = length
+        self.is_max = is_max
+        self.count = 0
+        self.deque = deque()  # (순번, 값)
+
+    def update(self, x):
+        while self.deque and (self.deque[-1][1] <= x if self.is_max else self.deque[-1][1] >= x):
+            self.deque.pop()
+        self.deque.append((self.count, x))
+        if self.deque[0][0] <= self.count - self.length:
+            self.deque.popleft()
+        self.count += 1
+        return self.deque[0][1] if self.count >= self.length else NAN
+
+class EMA:
+    """
+    지수이동평균 (adjust=False).
+    sma_seed=True이면 pandas_ta.ema처럼 첫 length개 평균으로 시작하고, 아니면 첫 값으로 시작 (pandas ewm).
+    """
+
+    def __init__(self, length, sma_seed=True):
+        self.length = length
+        self.alpha = 2 / (length + 1)
+        self.sma_seed = sma_seed
+        self.seed = []
+        self.value = None
+
+    def update(self, x):
+        if _is_nan(x):
+            return NAN if self.value is None else self.value
+        if self.value is None:
+            if not self.sma_seed:
+                self.value = x
+                return self.value
+            self.seed.append(x)
+            if len(self.seed) < self.length:
+                return NAN
+            self.value = sum(self.seed) / self.length
+            self.seed = []
+            return self.value
+        self.value += self.alpha * (x - self.value)
+        return self.value
+
+class WilderAverage:
+    """pandas_ta.rma와 같은 ewm(alpha=1/length, adjust=True, min_periods=length) - 가중합 / 가중치합을 누적"""
+
+    def __init__(self, length):
+        self.length = length
+        self.decay = 1 - 1 / length
+        self.numerator = 0.0
+        self.denominator = 0.0
+        self.count = 0
+
+    def update(self, x):
+        self.numerator = x + self.decay * self.numerator
+        self.denominator = 1 + self.decay * self.denominator
+        self.count += 1
+        return self.numerator / self.denominator if self.count >= self.length else NAN
+
+class IndicatorEngine:
+    """
+    add_indicators와 같은 지표를 봉 하나당 O(1)로 갱신하는 상태 기반 엔진입니다.
+    - update(bar): 마감된 봉을 반영하고 지표 값을 dict로 반환
+    - update(bar, closed=False): 진행 중인 봉을 임시로 반영 (다음 update 때 되돌린 뒤 다시 계산)
+    분봉 스트리밍처럼 같은 봉이 여러 번 갱신되는 경우에도 쓸 수 있습니다.
+    엔진 객체는 pickle로 저장해 두었다가 이어서 쓸 수 있습니다.
+    """
+
+    def __init__(self, history_size=1000):
+        self.history_size = history_size
+        self.history = {}  # 봉 시작 시각 -> 지표 값 (최근 history_size개)
+        self.sma_7 = RollingMean(7)
+        self.ema = {length: EMA(length) for length in (7, 14, 35)}
+        self.rsi_gain = WilderAverage(14)
+        self.rsi_loss = WilderAverage(14)
+        self.lowest_low = RollingExtreme(14, is_max=False)
+        self.highest_high = RollingExtreme(14, is_max=True)
+        self.stoch_k = RollingMean(3)
+        self.stoch_d = RollingMean(3)
+        self.macd_fast = EMA(12, sma_seed=False)
+        self.macd_slow = EMA(26, sma_seed=False)
+        self.macd_signal = EMA(9, sma_seed=False)
+        self.bollinger = RollingStd(20)
+        self.previous_close = None
+        self.last_timestamp = None
+        self._provisional = None  # 진행 중인 봉 반영 전 상태
+
+    def _snapshot(self):
+        # 지표 이력은 같은 시각 값이 다시 덮어쓰므로 복사하지 않음
+        state = {k: v for k, v in self.__dict__.items() if k not in ('_provisional', 'history')}
+        return copy.deepcopy(state)
+
+    def update(self, bar, timestamp=None, closed=True):
+        """
+        Parameters:
+        - bar: 'high', 'low', 'close' 키를 가진 dict 또는 Series
+        - timestamp: 봉 시작 시각 (선택)
+        - closed (bool): 봉이 마감되었는지 여부
+        Returns:
+        - dict: 지표 이름 -> 값 (워밍업 중이면 NaN)
+        """
+        if self._provisional is not None:
+            # 직전에 반영한 진행 중 봉을 되돌림
+            self.__dict__.update(self._provisional)
+            self._provisional = None
+        if not closed:
+            self._provisional = self._snapshot()
+
+        high, low, close = float(bar['high']), float(bar['low']), float(bar['close'])
+        values = {
+            'SMA_7': self.sma_7.update(close),
+            'EMA_7': self.ema[7].update(close),
+            'EMA_14': self.ema[14].update(close),
+            'EMA_35': self.ema[35].update(close),
+        }
+
+        # RSI (Wilder 평균, 첫 봉은 변화량이 없으므로 건너뜀)
+        rsi = NAN
+        if self.previous_close is not None:
+            change = close - self.previous_close
+            gain = self.rsi_gain.update(max(change, 0.0))
+            loss = self.rsi_loss.update(max(-change, 0.0))
+            if not _is_nan(gain) and gain + loss != 0:
+                rsi = 100 * gain / (gain + loss)
+        values['RSI_14'] = rsi
+        self.previous_close = close
+
+        # Stochastic (14, 3, 3)
+        lowest, highest = self.lowest_low.update(low), self.highest_high.update(high)
+        raw_k = NAN
+        if not _is_nan(lowest):
+            price_range = highest - lowest
+            raw_k = 100 * (close - lowest) / (price_range if price_range != 0 else sys.float_info.epsilon)
+        values['STOCHk_14_3_3'] = self.stoch_k.update(raw_k)
+        values['STOCHd_14_3_3'] = self.stoch_d.update(values['STOCHk_14_3_3'])
+
+        # MACD (12, 26, 9)
+        macd = self.macd_fast.update(close) - self.macd_slow.update(close)
+        signal = self.macd_signal.update(macd)
+        values['MACD'] = macd
+        values['Signal_Line'] = signal
+        values['MACD_Histogram'] = macd - signal
+
+        # Bollinger Bands (20, 2)
+        middle, std_dev = self.bollinger.update(close)
+        values['Middle_Band'] = middle
+        values['Upper_Band'] = middle + std_dev * 2
+        values['Lower_Band'] = middle - std_dev * 2
+
+        if timestamp is not None:
+            self.history[timestamp] = values
+            if len(self.history) > self.history_size:
+                del self.history[next(iter(self.history))]
+            if closed:
+                self.last_timestamp = timestamp
+        return values
+
+    def update_frame(self, df, last_closed=False):
+        """
+        OHLCV DataFrame 중 아직 반영하지 않은 봉만 엔진에 넣고, df 전체 행에 맞춘 지표 DataFrame을 반환합니다.
+        마지막 봉은 last_closed가 False이면 진행 중인 봉으로 취급합니다.
+        엔진이 보기 전의 오래된 행은 NaN입니다.
+        """
+        import pandas as pd
+        new_rows = df if self.last_timestamp is None else df[df.index > self.last_timestamp]
+        bars = new_rows[['high', 'low', 'close']].to_dict('records')
+        for i, (timestamp, bar) in enumerate(zip(new_rows.index, bars)):
+            self.update(bar, timestamp, closed=last_closed or i < len(bars) - 1)
+        rows = [self.history.get(timestamp, {}) for timestamp in df.index]
+        return pd.DataFrame(rows, index=df.index, columns=INDICATOR_COLUMNS)
+
+def max_relative_error(engine_df, reference_df, columns=INDICATOR_COLUMNS):
+    """
+    엔진 결과와 pandas_ta(add_indicators) 결과의 컬럼별 최대 상대 오차를 계산합니다.
+    NaN 위치가 다르면 해당 컬럼은 inf로 표시합니다.
+    """
+    errors = {}
+    for column in columns:
+        ours, theirs = engine_df[column], reference_df[column]
+        if not ours.isna().equals(theirs.isna()):
+            errors[column] = math.inf
+            continue
+        mask = ~theirs.isna()
+        diff = (ours[mask] - theirs[mask]).abs() / theirs[mask].abs().clip(lower=1e-9)
+        errors[column] = float(diff.max()) if mask.any() else 0.0
+    return errors
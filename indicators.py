@@ -0,0 +1,341 @@
+"""
+pandas_ta 없이 NumPy만으로 계산하는 기술적 지표 모음입니다.
+함수 이름과 인자는 pandas_ta와 같게 맞췄습니다 (sma, ema, rsi, stoch, macd, bbands, atr, obv).
+- pandas Series를 넣으면 pandas_ta와 같은 이름의 Series / DataFrame을 반환
+- NumPy 배열을 넣으면 float64 배열(또는 배열 tuple)을 반환
+"""
+import math
+import sys
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+def _as_array(values):
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+def _first_valid(x):
+    # 대부분 첫 값부터 유효하므로 전체 배열을 훑지 않고 바로 반환
+    if not len(x) or not np.isnan(x[0]):
+        return 0
+    valid = ~np.isnan(x)
+    first = int(valid.argmax())
+    return first if valid[first] else len(x)
+
+def _nan_head(n, valid_from):
+    # 앞쪽 valid_from개만 NaN으로 채운 빈 배열 (나머지는 호출한 쪽에서 채움)
+    out = np.empty(n)
+    out[:valid_from] = np.nan
+    return out
+
+def _wrap(source, columns):
+    """source가 Series이면 결과를 같은 인덱스의 Series(1개) 또는 DataFrame(여러 개)으로 감쌈"""
+    if not hasattr(source, "index"):
+        values = list(columns.values())
+        return values[0] if len(values) == 1 else tuple(values)
+    import pandas as pd
+    if len(columns) == 1:
+        name, values = next(iter(columns.items()))
+        return pd.Series(values, index=source.index, name=name)
+    return pd.DataFrame(columns, index=source.index)
+
+def _linear_recurrence(x, decay, gain, initial=0.0, out=None):
+    """
+    y[t] = decay * y[t-1] + gain * x[t] (y[-1] = initial)를 블록 단위로 벡터화해 계산합니다.
+    블록 안에서는 y[j] = decay^j * (decay * y_prev + cumsum(gain * x[i] / decay^i))이며,
+    decay^-j가 float64 범위를 넘지 않도록 블록 크기를 정합니다. out을 주면 그 배열에 바로 씀 (임시 배열 없이 제자리 연산).
+    """
+    n = len(x)
+    y = np.empty(n) if out is None else out
+    if decay == 0:
+        np.multiply(x, gain, out=y)
+        return y
+    block = max(1, min(16384, int(500 / -math.log(decay))))
+    exponents = np.arange(min(block, n))
+    powers = decay ** exponents
+    scales = gain * decay ** -exponents
+    previous = initial
+    for start in range(0, n, block):
+        chunk = y[start:start + block]
+        size = len(chunk)
+        np.multiply(x[start:start + size], scales[:size], out=chunk)
+        np.cumsum(chunk, out=chunk)
+        chunk += decay * previous
+        chunk *= powers[:size]
+        previous = chunk[-1]
+    return y
+
+def _ewm_adjust_false(x, alpha, start, initial=None):
+    """pandas ewm(alpha, adjust=False): x[start](또는 initial)에서 시작하는 지수이동평균 (start 이전은 NaN)"""
+    out = _nan_head(len(x), start)
+    if start < len(x):
+        out[start] = x[start] if initial is None else initial
+        _linear_recurrence(x[start + 1:], 1 - alpha, alpha, out[start], out=out[start + 1:])
+    return out
+
+# 누적합 / 창 연산을 나누어 처리할 행 수 (자릿수 손실과 임시 배열 크기 제한)
+BLOCK_ROWS = 65536
+
+def _rolling_sum(x, length):
+    """
+    창 길이 length의 이동 합계.
+    블록마다 첫 값을 기준으로 평행 이동한 누적합을 써서, 긴 이력에서도 누적합이 커지며 생기는 오차를 막음.
+    """
+    out = _nan_head(len(x), length - 1)
+    cumulative = np.zeros(min(len(x), BLOCK_ROWS + length - 1) + 1)
+    for start in range(length - 1, len(x), BLOCK_ROWS):
+        segment = x[start - length + 1:start + BLOCK_ROWS]
+        shift = segment[0]
+        running = cumulative[1:len(segment) + 1]
+        np.subtract(segment, shift, out=running)
+        np.cumsum(running, out=running)
+        window = out[start:start + len(segment) - length + 1]
+        np.subtract(cumulative[length:len(segment) + 1], cumulative[:len(segment) + 1 - length], out=window)
+        window += shift * length
+    return out
+
+def _sma(x, length):
+    start = _first_valid(x)
+    if len(x) - start < length:
+        return np.full(len(x), np.nan)
+    if start:
+        out = np.concatenate((np.full(start, np.nan), _rolling_sum(x[start:], length)))
+    else:
+        out = _rolling_sum(x, length)
+    out /= length
+    return out
+
+# 이동 표준편차를 계산할 때 누적합의 기준점을 다시 잡는 행 수 (작을수록 큰 누적합끼리 빼며 생기는 자릿수 손실이 작음)
+STD_BLOCK_ROWS = 128
+
+def _rolling_std(x, length, ddof):
+    """
+    창 길이 length의 이동 표준편차를 O(n)으로 계산합니다.
+    STD_BLOCK_ROWS행 블록마다 첫 값을 기준으로 평행 이동한 x, x²의 누적합으로 창 합계를 구하고,
+    분산은 (Σd² - (Σd)² / length) / (length - ddof)입니다. 블록은 겹치는 창의 2차원 뷰로 한 번에 처리합니다.
+    """
+    start = _first_valid(x)
+    values = x[start:]
+    if len(values) < length:
+        return np.full(len(x), np.nan)
+    out = _nan_head(len(x), start + length - 1)
+    count = len(values) - length + 1
+    blocks = -(-count // STD_BLOCK_ROWS)
+    padded = np.concatenate((values, np.full(blocks * STD_BLOCK_ROWS - count, values[-1])))
+    windows = sliding_window_view(padded, STD_BLOCK_ROWS + length - 1)[::STD_BLOCK_ROWS]
+    deviation = windows - windows[:, :1]
+    cumulative = np.zeros((2, blocks, STD_BLOCK_ROWS + length))
+    np.cumsum(deviation, axis=1, out=cumulative[0, :, 1:])
+    np.cumsum(deviation * deviation, axis=1, out=cumulative[1, :, 1:])
+    sums, squares = (cumulative[:, :, length:] - cumulative[:, :, :-length]).reshape(2, -1)[:, :count]
+    variance = np.maximum(squares - sums * sums / length, 0.0) / (length - ddof)
+    out[start + length - 1:] = np.sqrt(variance)
+    return out
+
+def _rma(x, length):
+    """pandas_ta.rma: ewm(alpha=1/length, adjust=True, min_periods=length), 앞쪽 NaN은 건너뜀"""
+    out = np.full(len(x), np.nan)
+    start = _first_valid(x)
+    values = x[start:]
+    if len(values) >= length:
+        decay = 1 - 1 / length
+        # 가중치 합 1 - decay^(t+1)로 나누는 보정은 decay^t가 0에 수렴하기 전의 앞부분에만 필요
+        average = _linear_recurrence(values, decay, 1 - decay)
+        head = min(len(values), int(40 / -math.log(decay)) + 1)
+        average[:head] /= 1 - decay ** np.arange(1, head + 1)
+        out[start + length - 1:] = average[length - 1:]
+    return out
+
+def _ema(x, length, sma=True):
+    start = _first_valid(x)
+    if not sma:
+        return _ewm_adjust_false(x, 2 / (length + 1), start)
+    # pandas_ta.ema: 첫 length개의 단순평균으로 시작
+    seed_end = start + length - 1
+    if seed_end >= len(x):
+        return np.full(len(x), np.nan)
+    return _ewm_adjust_false(x, 2 / (length + 1), seed_end, x[start:seed_end + 1].mean())
+
+def _rolling_extreme(x, length, accumulate):
+    """
+    창 길이 length의 이동 최솟값 / 최댓값.
+    창을 1, 2, 4, ...로 두 배씩 넓혀 가며 log2(length)번 비교하고, 마지막에 겹치는 두 창을 합칩니다.
+    accumulate: np.minimum 또는 np.maximum
+    """
+    n = len(x)
+    if n < length:
+        return np.full(n, np.nan)
+    out = _nan_head(n, length - 1)
+    extreme, width = x, 1
+    while width * 2 <= length:
+        # extreme[i]: x[i:i + 2 * width]의 최솟값 / 최댓값
+        extreme = accumulate(extreme[:-width], extreme[width:])
+        width *= 2
+    rest = length - width
+    out[length - 1:] = accumulate(extreme[:n - length + 1], extreme[rest:rest + n - length + 1])
+    return out
+
+def sma(close, length=10):
+    return _wrap(close, {f"SMA_{length}": _sma(_as_array(close), length)})
+
+def ema(close, length=10, sma=True):
+    return _wrap(close, {f"EMA_{length}": _ema(_as_array(close), length, sma)})
+
+def rsi(close, length=14):
+    x = _as_array(close)
+    values = np.full(len(x), np.nan)
+    start = _first_valid(x)
+    change = np.diff(x[start:])
+    if len(change) >= length:
+        # rma의 가중치 합은 상승분 / 전체 변동분에 공통이라 약분됨 - 가중 합계 두 개만 계산
+        decay = 1 - 1 / length
+        gain = _linear_recurrence(np.maximum(change, 0.0), decay, 1.0)
+        total = _linear_recurrence(np.abs(change), decay, 1.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            values[start + length:] = 100 * gain[length - 1:] / total[length - 1:]
+    return _wrap(close, {f"RSI_{length}": values})
+
+def stoch(high, low, close, k=14, d=3, smooth_k=3):
+    h, l, c = _as_array(high), _as_array(low), _as_array(close)
+    lowest = _rolling_extreme(l, k, np.minimum)
+    highest = _rolling_extreme(h, k, np.maximum)
+    price_range = highest - lowest
+    price_range[price_range == 0] = sys.float_info.epsilon
+    raw = 100 * (c - lowest) / price_range
+    stoch_k = _sma(raw, smooth_k)
+    stoch_d = _sma(stoch_k, d)
+    suffix = f"{k}_{d}_{smooth_k}"
+    return _wrap(close, {f"STOCHk_{suffix}": stoch_k, f"STOCHd_{suffix}": stoch_d})
+
+def macd(close, fast=12, slow=26, signal=9, sma=True):
+    """
+    pandas_ta.macd와 같은 MACD / 히스토그램 / 시그널.
+    sma=False이면 pandas ewm(adjust=False)처럼 첫 값에서 시작합니다.
+    """
+    x = _as_array(close)
+    line = _ema(x, fast, sma) - _ema(x, slow, sma)
+    signal_line = _ema(line, signal, sma)
+    suffix = f"{fast}_{slow}_{signal}"
+    return _wrap(close, {
+        f"MACD_{suffix}": line,
+        f"MACDh_{suffix}": line - signal_line,
+        f"MACDs_{suffix}": signal_line,
+    })
+
+def bbands(close, length=5, std=2.0, ddof=0):
+    """pandas_ta.bbands와 같은 하단 / 중간 / 상단 밴드, 밴드폭(%), %B"""
+    x = _as_array(close)
+    middle = _sma(x, length)
+    deviation = _rolling_std(x, length, ddof)
+    lower, upper = middle - std * deviation, middle + std * deviation
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bandwidth = 100 * (upper - lower) / middle
+        percent = (x - lower) / (upper - lower)
+    suffix = f"{length}_{float(std)}"
+    return _wrap(close, {
+        f"BBL_{suffix}": lower,
+        f"BBM_{suffix}": middle,
+        f"BBU_{suffix}": upper,
+        f"BBB_{suffix}": bandwidth,
+        f"BBP_{suffix}": percent,
+    })
+
+def bb_width(close, length=20, std=2.0, ddof=0):
+    x = _as_array(close)
+    deviation = _rolling_std(x, length, ddof)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = 100 * (2 * std * deviation) / _sma(x, length)
+    return _wrap(close, {f"BBB_{length}_{float(std)}": values})
+
+def atr(high, low, close, length=14):
+    h, l, c = _as_array(high), _as_array(low), _as_array(close)
+    previous_close = np.concatenate(([np.nan], c[:-1]))
+    true_range = np.fmax(h - l, np.fmax(np.abs(h - previous_close), np.abs(l - previous_close)))
+    true_range[0] = np.nan
+    return _wrap(close, {f"ATRr_{length}": _rma(true_range, length)})
+
+def obv(close, volume):
+    c, v = _as_array(close), _as_array(volume)
+    direction = np.concatenate(([1.0], np.sign(np.diff(c))))
+    return _wrap(close, {"OBV": np.cumsum(direction * v)})
+
+def _ewm_convergence_bars(alpha, tolerance):
+    # 시작값의 가중치 (1 - alpha)^t가 tolerance 아래로 떨어지는 데 필요한 봉 수
+    return math.ceil(math.log(tolerance) / math.log(1 - alpha))
+
+def warmup_bars(tolerance=1e-3):
+    """
+    add_indicators의 모든 지표가 수렴하는 데 필요한 봉 수입니다.
+    이동 창 지표는 창 길이, 지수 평균 지표(EMA, RSI, MACD)는 시작값의 영향이 tolerance 이하가 되는 길이를 씁니다.
+    """
+    lookbacks = [
+        7,                                                   # SMA_7
+        20,                                                  # Bollinger Bands
+        14 + 3 + 3 - 2,                                      # Stochastic %D
+        max(35, _ewm_convergence_bars(2 / 36, tolerance)),   # EMA_35
+        1 + _ewm_convergence_bars(1 / 14, tolerance),        # RSI_14
+        _ewm_convergence_bars(2 / 27, tolerance) + _ewm_convergence_bars(2 / 10, tolerance),  # MACD 26 + Signal 9
+    ]
+    return max(lookbacks)
+
+INDICATOR_WARMUP_BARS = warmup_bars()
+
+def add_indicators(df):
+    """
+    OHLCV DataFrame에 봇이 사용하는 지표 컬럼을 한 번에 추가합니다.
+    (SMA/EMA/RSI/Stochastic은 pandas_ta 방식, MACD와 볼린저 밴드는 pandas ewm / rolling std 방식)
+    """
+    close = _as_array(df['close'])
+    df['SMA_7'] = _sma(close, 7)
+    df['EMA_7'] = _ema(close, 7)
+    df['EMA_14'] = _ema(close, 14)
+    df['EMA_35'] = _ema(close, 35)
+    df['RSI_14'] = rsi(close, 14)
+    df['STOCHk_14_3_3'], df['STOCHd_14_3_3'] = stoch(df['high'].to_numpy(), df['low'].to_numpy(), close)
+    df['MACD'], df['MACD_Histogram'], df['Signal_Line'] = macd(close, sma=False)
+    middle = _sma(close, 20)
+    std_dev = _rolling_std(close, 20, ddof=1)
+    df['Middle_Band'] = middle
+    df['Upper_Band'] = middle + std_dev * 2
+    df['Lower_Band'] = middle - std_dev * 2
+    return df
+
+def _pandas_ta_indicators(df):
+    # 비교용 - 기존 autotrade add_indicators와 같은 pandas_ta 계산
+    import pandas_ta as ta
+    df['SMA_7'] = ta.sma(df['close'], length=7)
+    df['EMA_7'] = ta.ema(df['close'], length=7)
+    df['EMA_14'] = ta.ema(df['close'], length=14)
+    df['EMA_35'] = ta.ema(df['close'], length=35)
+    df['RSI_14'] = ta.rsi(df['close'], length=14)
+    stoch_df = ta.stoch(df['high'], df['low'], df['close'], k=14, d=3, smooth_k=3)
+    df[stoch_df.columns] = stoch_df
+    df['MACD'] = df['close'].ewm(span=12, adjust=False).mean() - df['close'].ewm(span=26, adjust=False).mean()
+    df['Signal_Line'] = df['MACD'].ewm(span=9, adjust=False).mean()
+    df['MACD_Histogram'] = df['MACD'] - df['Signal_Line']
+    df['Middle_Band'] = df['close'].rolling(window=20).mean()
+    std_dev = df['close'].rolling(window=20).std()
+    df['Upper_Band'] = df['Middle_Band'] + (std_dev * 2)
+    df['Lower_Band'] = df['Middle_Band'] - (std_dev * 2)
+    return df
+
+if __name__ == "__main__":
+    # 사용법: python indicators.py [봉 개수] - pandas_ta 대비 속도와 최대 상대 오차 비교
+    import time
+    import pandas as pd
+    from indicator_engine import max_relative_error
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+    close = 1e8 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    spread = close * rng.random(n) * 0.003
+    df = pd.DataFrame({'open': close, 'high': close + spread, 'low': close - spread, 'close': close},
+                      index=pd.date_range('2015-01-01', periods=n, freq='h'))
+
+    start = time.perf_counter()
+    ours = add_indicators(df.copy())
+    print(f"numpy kernels: {time.perf_counter() - start:.3f}s ({n:,} bars)")
+
+    start = time.perf_counter()
+    reference = _pandas_ta_indicators(df.copy())
+    print(f"pandas_ta:     {time.perf_counter() - start:.3f}s (import 제외)")
+    for column, error in max_relative_error(ours, reference).items():
+        print(f"{column:>15}: {error:.2e}")
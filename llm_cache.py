@@ -0,0 +1,139 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MODES = ("live", "record", "replay")
+
+class CacheMiss(Exception):
+    """replay 모드에서 캐시에 없는 요청"""
+
+def request_key(model, messages, params):
+    """모델 / 파라미터 / 메시지(지시문, 프롬프트 구역, 이미지 포함)를 정규화한 JSON의 SHA-256"""
+    canonical = json.dumps(
+        {"model": model, "params": params, "messages": messages},
+        sort_keys=True, ensure_ascii=False, separators=(',', ':'),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class LLMResponseCache:
+    """
+    같은 요청(모델 / 파라미터 / 메시지가 바이트 단위로 동일)에 대한 모델 응답을 SQLite에 저장합니다.
+    - live: 캐시를 쓰지 않고 항상 API 호출 (기본값)
+    - record: 캐시에 있으면 그대로 반환, 없으면 API를 호출해 저장
+    - replay: 캐시에서만 반환, 없으면 CacheMiss (API 호출 없음 - 백테스트 재실행용)
+    항목 수나 전체 크기가 한도를 넘으면 가장 오래 사용하지 않은 항목부터 지웁니다 (LRU).
+    """
+
+    def __init__(self, db_path='llm_cache.sqlite', mode="live", max_entries=10_000, max_bytes=200 * 1024 * 1024):
+        if mode not in MODES:
+            raise ValueError(f"Unsupported LLM cache mode: {mode} (one of {', '.join(MODES)})")
+        self.db_path = db_path
+        self.mode = mode
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        # live 모드에서는 파일을 만들지 않도록 처음 쓸 때 연결
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            with self._conn:
+                self._conn.execute('''
+                    CREATE TABLE IF NOT EXISTS llm_cache (
+                        key TEXT PRIMARY KEY,
+                        model TEXT,
+                        response TEXT,
+                        size INTEGER,
+                        created_ts REAL,
+                        last_used_ts REAL
+                    );
+                ''')
+                self._conn.execute('CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used_ts)')
+        return self._conn
+
+    def get(self, key):
+        """Returns: (응답, 응답한 모델) 또는 None"""
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute('SELECT response, model FROM llm_cache WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                with conn:
+                    conn.execute('UPDATE llm_cache SET last_used_ts = ? WHERE key = ?', (time.time(), key))
+            return row
+
+    def put(self, key, model, response):
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO llm_cache (key, model, response, size, created_ts, last_used_ts) VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, model, response, len(response.encode("utf-8")), now, now)
+                )
+                self._evict(conn)
+
+    def _evict(self, conn):
+        count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        removed = 0
+        for key, size in conn.execute('SELECT key, size FROM llm_cache ORDER BY last_used_ts').fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+            count, total, removed = count - 1, total - size, removed + 1
+        logger.info(f"LLM cache: evicted {removed} least recently used entries")
+
+    def complete(self, model, messages, params, call, validate=None, normalize=None):
+        """
+        Parameters:
+        - model (str): 요청한 모델 (캐시 키에 포함)
+        - call (callable): 인자 없이 API를 호출해 (응답 문자열, 실제로 응답한 모델)을 반환하는 함수
+          (hedge 요청처럼 다른 모델이 답할 수 있으므로, 저장 항목의 model에는 실제로 응답한 모델을 기록)
+        - validate (callable): 응답을 저장하기 전에 검사하는 함수 (예외가 나면 저장하지 않음 - 잘못된 응답이 재생되지 않도록)
+        - normalize (callable): 응답을 저장할 문자열로 바꾸는 함수 (예: 로컬에서 고친 결정 JSON).
+          None을 반환하면 저장하지 않고, 저장한 값을 그대로 반환해 record / replay 결과가 같도록 함
+        Returns:
+        - tuple: (모델 응답, 응답한 모델) - 캐시에서 재생한 경우 기록 당시 응답한 모델
+        Raises:
+        - CacheMiss: replay 모드에서 저장된 응답이 없을 때
+        """
+        if self.mode == "live":
+            return call()
+        key = request_key(model, messages, params)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            response, answered_by = cached
+            logger.info(f" ## LLM cache hit ({self.mode}): {key[:12]} (answered by {answered_by})")
+            return response, answered_by
+        self.misses += 1
+        if self.mode == "replay":
+            raise CacheMiss(f"No cached response for {model} request {key[:12]}")
+        response, answered_by = call()
+        if response is not None:
+            try:
+                if validate is not None:
+                    validate(response)
+                stored = normalize(response) if normalize is not None else response
+                if stored is None:
+                    raise ValueError("response could not be normalized")
+                self.put(key, answered_by, stored)
+                response = stored
+            except Exception as e:
+                logger.warning(f"LLM cache: response not stored ({e})")
+        return response, answered_by
+
+def cache_from_env(db_path='llm_cache.sqlite'):
+    """LLM_CACHE_MODE (live / record / replay) 환경 변수로 캐시를 만듭니다."""
+    return LLMResponseCache(db_path, mode=os.getenv("LLM_CACHE_MODE", "live"))
@@ -0,0 +1,109 @@
+import json
+import logging
+import math
+from token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# 프롬프트로 보낼 시장 데이터 - 이름: (봉 단위, 전송할 최근 봉 개수)
+MARKET_DATA_ROWS = {
+    "daily": ("day", 30),
+    "hourly": ("minute60", 24),
+}
+
+def _compact_value(value, decimals):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    value = round(float(value), decimals)
+    # 소수점 이하가 없으면 정수로 보내 "123.0" 같은 불필요한 글자를 줄임
+    return int(value) if value.is_integer() else value
+
+def frame_to_columnar(df, decimals=2):
+    """
+    OHLCV + 지표 DataFrame을 컬럼 목록과 행 배열로 변환합니다.
+    - 첫 컬럼은 Unix time(초) 타임스탬프
+    - 실수는 decimals 자리로 반올림, NaN은 null
+    - 모든 지표가 NaN인 워밍업 행과 전부 NaN인 컬럼은 제외
+    """
+    import pandas as pd
+    df = df.dropna(axis=1, how='all')
+    indicator_columns = [c for c in df.columns if c not in ('open', 'high', 'low', 'close', 'volume', 'value')]
+    if indicator_columns:
+        df = df.dropna(subset=indicator_columns, how='all')
+
+    timestamps = pd.DatetimeIndex(df.index).as_unit('s').asi8.tolist()
+    rows = [
+        [ts] + [_compact_value(v, decimals) for v in values]
+        for ts, values in zip(timestamps, df.itertuples(index=False, name=None))
+    ]
+    return {"columns": ["timestamp"] + list(df.columns), "data": rows}
+
+def prepare_market_frames(load, add_indicators, rows=MARKET_DATA_ROWS):
+    """
+    봇(autotrade_sj_v5.fetch_and_prepare_data)과 백테스트(backtest.ModelDecider)가 함께 쓰는 시장 데이터 준비 단계입니다.
+    지표가 수렴하도록 워밍업 구간까지 불러와 지표를 계산한 뒤, 전송할 최근 행만 남깁니다.
+    Parameters:
+    - load (callable): (봉 단위, 개수) -> OHLCV DataFrame
+    - add_indicators (callable): (DataFrame, 봉 단위) -> 지표 컬럼을 추가한 DataFrame
+    - rows (dict): 이름 -> (봉 단위, 전송할 최근 봉 개수)
+    Returns:
+    - dict: 이름 -> DataFrame (serialize_market_data 입력)
+    """
+    from indicators import INDICATOR_WARMUP_BARS  # numpy는 첫 데이터 준비 때 불러옴
+    frames = {}
+    for name, (interval, count) in rows.items():
+        df = add_indicators(load(interval, count + INDICATOR_WARMUP_BARS), interval)
+        frames[name] = df.iloc[INDICATOR_WARMUP_BARS:].tail(count)
+    return frames
+
+def serialize_market_data(frames, decimals=2):
+    """
+    {'daily': df, 'hourly': df} 형태의 DataFrame들을 한 번만 JSON으로 직렬화합니다.
+    Returns:
+    - str: 공백 없는 JSON 문자열
+    """
+    payload = {name: frame_to_columnar(df, decimals) for name, df in frames.items()}
+    return json.dumps(payload, separators=(',', ':'))
+
+def legacy_market_data(frames):
+    # 기존 방식: to_json(orient='split') 결과를 다시 json.dumps로 감싼 이중 인코딩
+    import pandas as pd
+    combined_df = pd.concat(list(frames.values()), keys=list(frames.keys()))
+    return json.dumps(combined_df.to_json(orient='split'))
+
+def compare_payloads(frames, decimals=2):
+    """
+    기존 이중 인코딩 방식과 컬럼형 직렬화의 크기 / 토큰 수를 비교해 로그로 남깁니다.
+    Returns:
+    - dict: 'legacy', 'compact' -> (bytes, tokens)
+    """
+    legacy = legacy_market_data(frames)
+    compact = serialize_market_data(frames, decimals)
+    report = {
+        "legacy": (len(legacy.encode('utf-8')), count_tokens(legacy)),
+        "compact": (len(compact.encode('utf-8')), count_tokens(compact)),
+    }
+    for name, (size, tokens) in report.items():
+        logger.info(f"Market data payload ({name}): {size:,} bytes, {tokens:,} tokens")
+    return report
+
+def truncate_market_data(content, budget):
+    """
+    serialize_market_data 결과가 budget 토큰을 넘으면 각 표에서 가장 오래된 행부터 버립니다.
+    JSON 구조는 그대로 유지됩니다.
+    """
+    tokens = count_tokens(content)
+    if tokens <= budget:
+        return content
+    payload = json.loads(content)
+    while tokens > budget:
+        table = max(payload.values(), key=lambda t: len(t["data"]))
+        total_rows = sum(len(t["data"]) for t in payload.values())
+        if total_rows == 0:
+            break
+        # 행당 평균 토큰 수로 버릴 행 수를 추정 (최소 1행)
+        drop = max(1, int((tokens - budget) / (tokens / total_rows)))
+        del table["data"][:min(drop, len(table["data"]))]
+        content = json.dumps(payload, separators=(',', ':'))
+        tokens = count_tokens(content)
+    return content
@@ -0,0 +1,137 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+UPBIT_WS_URL = "wss://api.upbit.com/websocket/v1"
+FEED_TYPES = ("ticker", "orderbook", "trade")
+
+class MarketFeed:
+    """
+    업비트 WebSocket(ticker / orderbook / trade)을 백그라운드 스레드에서 받아 최신 값을 메모리에 보관합니다.
+    - 최신 ticker, 최우선 호가를 포함한 orderbook, 최근 체결 tape_size개를 종목별로 유지
+    - 읽기는 dict 조회뿐이므로 REST 호출 없이 바로 반환
+    - 연결이 끊기면 지수 백오프로 다시 연결하고, 값이 stale_after초보다 오래되면 None을 반환해 REST로 대체하게 함
+    pyupbit.WebSocketManager는 주소가 고정되어 있고 구독 종류마다 프로세스를 띄우므로,
+    같은 websockets 라이브러리로 한 연결에서 세 종류를 모두 구독합니다 (url로 재생 서버 지정 가능).
+    """
+
+    def __init__(self, codes=("KRW-BTC",), url=UPBIT_WS_URL, tape_size=1000, stale_after=10.0):
+        self.codes = list(codes)
+        self.url = url
+        self.tape_size = tape_size
+        self.stale_after = stale_after
+        self._latest = {}  # (종류, 종목) -> (수신 시각, 메시지)
+        self._tapes = {code: deque(maxlen=tape_size) for code in self.codes}
+        self._ready = threading.Event()
+        self._thread = None
+        self._loop = None
+        self._task = None
+        self.messages = 0
+
+    def _subscription(self):
+        return [{"ticket": str(uuid.uuid4())}] + [
+            {"type": kind, "codes": self.codes} for kind in FEED_TYPES
+        ] + [{"format": "DEFAULT"}]
+
+    def _handle(self, message):
+        kind, code = message.get("type"), message.get("code")
+        if kind not in FEED_TYPES or code not in self._tapes:
+            return
+        self._latest[(kind, code)] = (time.time(), message)
+        if kind == "trade":
+            self._tapes[code].append(message)
+        self.messages += 1
+        if all((k, c) in self._latest for k in ("ticker", "orderbook") for c in self.codes):
+            self._ready.set()
+
+    async def _run(self):
+        import websockets
+        backoff = 1
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=60, max_size=None) as websocket:
+                    await websocket.send(json.dumps(self._subscription()))
+                    logger.info(f"Market feed connected: {self.url} {self.codes}")
+                    backoff = 1
+                    async for raw in websocket:
+                        self._handle(json.loads(raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Market feed disconnected ({e}), reconnecting in {backoff}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        self._task = self._loop.create_task(self._run())
+        try:
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    def start(self):
+        """
+        Raises:
+        - ImportError: websockets가 설치되지 않은 경우 (스레드를 띄우기 전에 알려, 호출한 쪽이 바로 REST로 대체하도록)
+        """
+        import websockets  # noqa: F401
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._thread_main, name="market-feed", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._task is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def wait_ready(self, timeout=None):
+        """구독한 모든 종목의 ticker와 orderbook을 한 번 이상 받을 때까지 대기"""
+        return self._ready.wait(timeout)
+
+    def latest(self, kind, code, max_age=None):
+        """
+        Returns:
+        - dict or None: 가장 최근 메시지 (없거나 max_age(기본 stale_after)초보다 오래되면 None)
+        """
+        entry = self._latest.get((kind, code))
+        if entry is None:
+            return None
+        received_at, message = entry
+        if time.time() - received_at > (self.stale_after if max_age is None else max_age):
+            return None
+        return message
+
+    def ticker(self, code="KRW-BTC"):
+        return self.latest("ticker", code)
+
+    def orderbook(self, code="KRW-BTC"):
+        """pyupbit.get_orderbook과 같은 형태로 변환한 최신 호가 (없으면 None)"""
+        message = self.latest("orderbook", code)
+        if message is None:
+            return None
+        return {
+            "market": code,
+            "timestamp": message["timestamp"],
+            "total_ask_size": message.get("total_ask_size"),
+            "total_bid_size": message.get("total_bid_size"),
+            "orderbook_units": message["orderbook_units"],
+        }
+
+    def trades(self, code="KRW-BTC", since_ms=None):
+        """최근 체결 목록 (오래된 순), since_ms를 주면 그 이후 체결만"""
+        tape = list(self._tapes[code])
+        if since_ms is not None:
+            tape = [trade for trade in tape if trade["trade_timestamp"] > since_ms]
+        return tape
@@ -0,0 +1,117 @@
+import argparse
+import asyncio
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def load_recording(path):
+    """JSON Lines 파일(한 줄에 WebSocket 메시지 하나)을 읽어 메시지 목록을 반환합니다."""
+    with open(path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+class ReplayServer:
+    """
+    기록해 둔 업비트 WebSocket 메시지를 재생하는 로컬 서버입니다. 테스트에서 업비트 대신 MarketFeed의 url로 지정합니다.
+    클라이언트의 구독 요청(type / codes)에 맞는 메시지만 업비트처럼 bytes로 보냅니다.
+    - interval: 메시지 사이 대기 시간 (초)
+    - repeat: True이면 끝까지 보낸 뒤 처음부터 반복
+    """
+
+    def __init__(self, messages, host="127.0.0.1", port=0, interval=0.0, repeat=False):
+        self.messages = messages
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.repeat = repeat
+        self._loop = None
+        self._stop = None
+        self._started = threading.Event()
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    async def _handler(self, websocket):
+        subscription = json.loads(await websocket.recv())
+        wanted = {(item["type"], code) for item in subscription if "type" in item for code in item.get("codes", [])}
+        while True:
+            for message in self.messages:
+                if (message.get("type"), message.get("code")) in wanted:
+                    await websocket.send(json.dumps(message).encode("utf-8"))
+                    await asyncio.sleep(self.interval)
+            if not self.repeat:
+                break
+        # 재생이 끝나도 연결은 유지 (클라이언트가 재연결하며 같은 메시지를 반복해서 받지 않도록)
+        await websocket.wait_closed()
+
+    async def _serve(self):
+        import websockets
+        self._stop = asyncio.Event()
+        async with websockets.serve(self._handler, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._started.set()
+            await self._stop.wait()
+
+    def _thread_main(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._thread_main, name="market-replay", daemon=True)
+        self._thread.start()
+        if not self._started.wait(5):
+            raise RuntimeError("Replay server failed to start")
+        logger.info(f"Replay server listening on {self.url} ({len(self.messages)} messages)")
+        return self
+
+    def stop(self):
+        if self._loop is not None and self._stop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+async def _record(path, codes, count, url):
+    import uuid
+    import websockets
+    from market_feed import FEED_TYPES
+    subscription = [{"ticket": str(uuid.uuid4())}] + [{"type": kind, "codes": codes} for kind in FEED_TYPES]
+    async with websockets.connect(url, max_size=None) as websocket:
+        await websocket.send(json.dumps(subscription))
+        with open(path, "w", encoding="utf-8") as file:
+            for _ in range(count):
+                file.write(json.dumps(json.loads(await websocket.recv()), ensure_ascii=False) + "\n")
+
+if __name__ == "__main__":
+    # 사용법:
+    #   python market_replay.py record feed.jsonl --count 500   # 실제 업비트 메시지 기록
+    #   python market_replay.py serve feed.jsonl --port 8765     # MARKET_FEED_URL=ws://127.0.0.1:8765 로 봇 실행
+    from market_feed import UPBIT_WS_URL
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="업비트 WebSocket 메시지 기록 / 재생")
+    parser.add_argument("command", choices=["record", "serve"])
+    parser.add_argument("path")
+    parser.add_argument("--codes", default="KRW-BTC")
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=0.05)
+    args = parser.parse_args()
+    if args.command == "record":
+        asyncio.run(_record(args.path, args.codes.split(","), args.count, UPBIT_WS_URL))
+    else:
+        server = ReplayServer(load_recording(args.path), port=args.port, interval=args.interval, repeat=True).start()
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.stop()
@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from retry_policy import TransientError, get_policy
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """
+    한 시점의 호가 정보입니다. 사이클 안에서 상태 작성 / 주문 확인 / 기록이 같은 값을 쓰도록 한 번만 받아 공유합니다.
+    """
+    ticker: str
+    orderbook: dict
+    captured_at: float  # time.time() 기준 수집 시각
+
+    @classmethod
+    def capture(cls, ticker):
+        from http_client import get_pyupbit
+
+        def fetch():
+            orderbook = get_pyupbit().get_orderbook(ticker=ticker)
+            if not orderbook:
+                raise TransientError(f"Failed to fetch orderbook: {ticker}")
+            return orderbook
+        return cls(ticker, get_policy("upbit").call(fetch), time.time())
+
+    @property
+    def ask_price(self):
+        return self.orderbook['orderbook_units'][0]["ask_price"]
+
+    @property
+    def bid_price(self):
+        return self.orderbook['orderbook_units'][0]["bid_price"]
+
+    @property
+    def timestamp(self):
+        return self.orderbook['timestamp']
+
+    def age(self):
+        return time.time() - self.captured_at
+
+class MarketSnapshotCache:
+    """
+    마지막 스냅샷을 보관하다가 max_age_seconds보다 오래되었을 때만 새로 받아옵니다.
+    feed(MarketFeed)가 연결되어 있으면 REST 대신 WebSocket으로 받아둔 최신 호가로 스냅샷을 만듭니다.
+    """
+
+    def __init__(self, ticker, max_age_seconds=120, feed=None):
+        self.ticker = ticker
+        self.max_age_seconds = max_age_seconds
+        self.feed = feed
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self, max_age_seconds=None):
+        max_age = self.max_age_seconds if max_age_seconds is None else max_age_seconds
+        with self._lock:
+            if self._snapshot is None or self._snapshot.age() > max_age:
+                orderbook = self.feed.orderbook(self.ticker) if self.feed is not None else None
+                if orderbook is not None:
+                    self._snapshot = MarketSnapshot(self.ticker, orderbook, time.time())
+                    source = "feed"
+                else:
+                    self._snapshot = MarketSnapshot.capture(self.ticker)
+                    source = "rest"
+                logger.info(f"Market snapshot captured ({source}): {self.ticker} ask={self._snapshot.ask_price:,}")
+            return self._snapshot
+
+    def refresh(self):
+        """사이클 시작 시 이전 사이클의 스냅샷을 쓰지 않도록 강제로 새로 받음"""
+        return self.get(max_age_seconds=0)
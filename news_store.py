@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DAY_SECONDS = 24 * 60 * 60
+
+def normalize_title(title):
+    """대소문자 / 문장부호 / 공백 차이와 ' - 매체명' 꼬리를 무시한 제목"""
+    title = re.sub(r"\s+[-|–—]\s+[^-|–—]{1,40}$", "", title or "")
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", title.lower()).split())
+
+def title_hash(title):
+    # 제목이 비어 있으면 중복 판정에서 제외 (SQLite UNIQUE는 NULL끼리 겹치지 않음)
+    normalized = normalize_title(title)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16] if normalized else None
+
+def url_source(url):
+    """기사 URL의 호스트 (스킴이 없거나 잘못된 URL이면 빈 문자열)"""
+    try:
+        return urlparse(url).netloc
+    except ValueError:
+        return ""
+
+def parse_published(value, default_ts):
+    """Tavily published_date (RFC 2822 또는 ISO 8601)를 epoch 초로 변환, 실패하면 default_ts"""
+    if not value:
+        return default_ts
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return default_ts
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+class NewsStore:
+    """
+    뉴스 기사를 URL 기준으로 SQLite에 저장하고, 정규화한 제목 해시로 매체만 다른 같은 기사를 걸러냅니다.
+    검색은 마지막으로 본 published_date 이후 기간만 요청하고, 프롬프트에는 저장소에서 최근 기사 상위 K개를 보냅니다.
+    """
+
+    def __init__(self, db_path='news.sqlite', window_days=7, refresh_seconds=60 * 60):
+        self.db_path = db_path
+        self.window_days = window_days
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._last_fetch = 0.0
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS news (
+                    url TEXT PRIMARY KEY,
+                    title_hash TEXT UNIQUE,
+                    title TEXT,
+                    source TEXT,
+                    published_ts INTEGER,
+                    fetched_ts INTEGER
+                );
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_news_published ON news (published_ts)')
+
+    def search_days(self, now):
+        """마지막으로 본 기사 이후를 덮는 검색 기간 (일 단위, 1 ~ window_days)"""
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            (last_ts,) = conn.execute('SELECT MAX(published_ts) FROM news').fetchone()
+        if last_ts is None:
+            return self.window_days
+        return max(1, min(self.window_days, math.ceil((now - last_ts) / DAY_SECONDS)))
+
+    def add(self, results, now):
+        """
+        Tavily 검색 결과를 저장합니다.
+        Returns:
+        - int: 새로 저장된 기사 수 (URL 또는 제목이 겹치는 기사는 제외)
+        """
+        rows = [
+            (r["url"], title_hash(r.get("title")), r.get("title"), url_source(r["url"]),
+             parse_published(r.get("published_date"), int(now)), int(now))
+            for r in results if r.get("url")
+        ]
+        with closing(sqlite3.connect(self.db_path)) as conn, conn:
+            before = conn.total_changes
+            conn.executemany(
+                'INSERT OR IGNORE INTO news (url, title_hash, title, source, published_ts, fetched_ts) VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            added = conn.total_changes - before
+            # 검색 기간을 벗어난 오래된 기사 정리
+            conn.execute('DELETE FROM news WHERE published_ts < ?', (int(now) - self.window_days * DAY_SECONDS,))
+            return added
+
+    def top(self, k, now):
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            return conn.execute(
+                'SELECT published_ts, source, title FROM news WHERE published_ts >= ? ORDER BY published_ts DESC LIMIT ?',
+                (int(now) - self.window_days * DAY_SECONDS, k)
+            ).fetchall()
+
+    def get_news(self, search, k=30):
+        """
+        Parameters:
+        - search (callable): 검색 기간(일)을 받아 Tavily 결과 목록을 반환하는 함수
+        - k (int): 반환할 기사 수
+        Returns:
+        - str: 최신순 "YYYY-MM-DD HH:MM | 출처 | 제목" 줄 목록
+        """
+        now = time.time()
+        with self._lock:
+            if now - self._last_fetch >= self.refresh_seconds:
+                days = self.search_days(now)
+                try:
+                    results = search(days)
+                    added = self.add(results, now)
+                    self._last_fetch = now
+                    logger.info(f"News: {len(results)} results for {days} day(s), {added} new")
+                except Exception as e:
+                    # 검색이 실패해도 저장된 기사로 진행
+                    logger.error(f"Error fetching news, using stored articles: {e}")
+            else:
+                logger.info("News: served from local store")
+            rows = self.top(k, now)
+        return "\n".join(
+            f"{datetime.fromtimestamp(ts, timezone.utc):%Y-%m-%d %H:%M} | {source} | {title}"
+            for ts, source, title in rows
+        )
@@ -23,6 +23,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException, WebDriverException, NoSuchElementException
+from prompt_builder import log_prompt_cache_usage
+from llm_cache import cache_from_env
 import logging
 import base64
 
@@ -30,6 +32,7 @@ import base64
 
 # Setup
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+llm_cache = cache_from_env()  # LLM_CACHE_MODE: live(기본) / record / replay
 upbit = pyupbit.Upbit(os.getenv("UPBIT_ACCESS_KEY"), os.getenv("UPBIT_SECRET_KEY"))
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -373,42 +376,64 @@ def fetch_bitcoin_news():
 
     return result    
 
+# 지시문 캐시 - 파일 경로: (수정 시각, 시스템 메시지)
+_instructions_cache = {}
+
 def get_instructions(file_path):
     try:
+        mtime = os.path.getmtime(file_path)
+        cached = _instructions_cache.get(file_path)
+        if cached and cached[0] == mtime:
+            return cached[1]["content"]
         with open(file_path, "r", encoding="utf-8") as file:
             instructions = file.read()
+        # 시스템 메시지는 내용이 바뀔 때만 새로 만들어, 매 사이클 같은 접두부가 전송되도록 함 (프롬프트 캐싱)
+        _instructions_cache[file_path] = (mtime, {"role": "system", "content": instructions})
+        logger.info(f"Instructions loaded: {file_path}")
         return instructions
     except FileNotFoundError:
         logger.error("File not found.")
     except Exception as e:
-        logger.error("An error occurred while reading the file:", e)
+        logger.error(f"An error occurred while reading the file: {e}")
+
+def get_system_message(file_path):
+    if not get_instructions(file_path):
+        return None
+    return _instructions_cache[file_path][1]
 
 def analyze_data_with_o1mini(data_json, last_decisions, bitcoin_news, fear_and_greed, current_status, current_base64_image):
     instructions_path = "o1_mini_instructions_v1.md"
     try:
-        instructions = get_instructions(instructions_path)
-        if not instructions:
+        system_message = get_system_message(instructions_path)
+        if not system_message:
             logger.info("No instructions found.")
             return None          
-        response = client.chat.completions.create(
-            model="o1-mini",
+        model = "o1-mini"
+        messages = [
+            system_message,  # 역할 및 전략 설명 (고정 접두부 - 프롬프트 캐싱 대상)
+            
+            {"role": "user", "content": f"""
+                Here is the latest market data and relevant analysis:
+                - **Market Analysis**: {data_json}
+                - **Previous Decisions**: {last_decisions}
+                - **Cryptocurrency News**: {bitcoin_news}
+                - **Fear and Greed Index**: {fear_and_greed}
+                - **Current Investment State**: {current_status}
+            """} # 시장 분석, 이전 결정, 암호화폐 뉴스, 공포와 탐욕 지수, 현재 투자 상태 입력
+        ]
+        params = dict(
             # reasoning_effort="high",
             # store="true",
-            messages=[
-                {"role": "system", "content": instructions},  # 역할 및 전략 설명
-                
-                {"role": "user", "content": f"""
-                    Here is the latest market data and relevant analysis:
-                    - **Market Analysis**: {data_json}
-                    - **Previous Decisions**: {last_decisions}
-                    - **Cryptocurrency News**: {bitcoin_news}
-                    - **Fear and Greed Index**: {fear_and_greed}
-                    - **Current Investment State**: {current_status}
-                """} # 시장 분석, 이전 결정, 암호화폐 뉴스, 공포와 탐욕 지수, 현재 투자 상태 입력
-            ],
             response_format={"type": "json_object"},
         )
-        advice = response.choices[0].message.content
+
+        def call():
+            response = client.chat.completions.create(model=model, messages=messages, **params)
+            log_prompt_cache_usage(response.usage)
+            return response.choices[0].message.content, model
+
+        # 같은 요청은 LLM_CACHE_MODE(record / replay)에 따라 저장된 응답을 사용 (JSON으로 읽히는 응답만 저장)
+        advice, _ = llm_cache.complete(model, messages, params, call, validate=json.loads)
         logger.info(f" ## AI Result: {advice}")
         return advice
     except Exception as e:
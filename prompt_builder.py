@@ -0,0 +1,92 @@
+import logging
+from dataclasses import dataclass
+from typing import Callable, Optional
+from token_counter import count_tokens
+
+logger = logging.getLogger(__name__)
+
+TRUNCATED_MARK = " ...(truncated)"
+
+@dataclass
+class PromptSection:
+    """
+    프롬프트의 한 구역과 그 토큰 예산입니다.
+    - separator를 지정하면 내용을 항목 단위로 나누어 뒤쪽 항목부터 버립니다 (최신 항목이 앞에 오도록 정렬되어 있어야 함).
+    - truncate를 지정하면 (내용, 예산) -> 잘린 내용 함수를 그대로 사용합니다.
+    - 전체 한도를 넘으면 priority가 낮은 구역부터 더 줄입니다.
+    """
+    name: str
+    label: str
+    content: str
+    budget: int
+    priority: int = 0
+    separator: Optional[str] = None
+    truncate: Optional[Callable[[str, int], str]] = None
+
+def truncate_text(content, budget):
+    tokens = count_tokens(content)
+    if tokens <= budget:
+        return content
+    if budget <= 0:
+        return ""
+    # 토큰 비율로 자를 위치를 추정한 뒤 예산 안에 들어올 때까지 조금씩 줄임
+    cut = int(len(content) * budget / tokens)
+    while cut > 0 and count_tokens(content[:cut] + TRUNCATED_MARK) > budget:
+        cut = int(cut * 0.9)
+    return content[:cut] + TRUNCATED_MARK if cut > 0 else ""
+
+def truncate_items(content, budget, separator):
+    kept = []
+    used = 0
+    for item in content.split(separator):
+        cost = count_tokens(item + separator)
+        if used + cost > budget:
+            break
+        kept.append(item)
+        used += cost
+    return separator.join(kept)
+
+def _fit(section, budget):
+    if section.truncate is not None:
+        return section.truncate(section.content, budget)
+    if section.separator is not None:
+        return truncate_items(section.content, budget, section.separator)
+    return truncate_text(section.content, budget)
+
+def build_prompt(sections, ceiling, header="Here is the latest market data and relevant analysis:"):
+    """
+    구역별 예산을 적용하고 전체 토큰 수를 ceiling 이하로 맞춘 사용자 프롬프트를 만듭니다.
+    Returns:
+    - tuple: (프롬프트 문자열, 구역 이름 -> (원래 토큰 수, 최종 토큰 수))
+    """
+    original = {s.name: count_tokens(s.content) for s in sections}
+    fitted = {s.name: _fit(s, s.budget) for s in sections}
+    used = {name: count_tokens(text) for name, text in fitted.items()}
+
+    # 전체 한도를 넘으면 우선순위가 낮은 구역부터 초과분만큼 줄임
+    overhead = count_tokens(header) + sum(count_tokens(f"- **{s.label}**: ") + 1 for s in sections)
+    for section in sorted(sections, key=lambda s: s.priority):
+        overflow = overhead + sum(used.values()) - ceiling
+        if overflow <= 0:
+            break
+        fitted[section.name] = _fit(section, max(0, used[section.name] - overflow))
+        used[section.name] = count_tokens(fitted[section.name])
+
+    lines = [header] + [f"- **{s.label}**: {fitted[s.name]}" for s in sections]
+    prompt = "\n".join(lines)
+
+    breakdown = ", ".join(f"{s.name}={used[s.name]}/{original[s.name]}" for s in sections)
+    logger.info(f" ## Prompt tokens: {breakdown}, total={count_tokens(prompt)}/{ceiling}")
+    return prompt, {s.name: (original[s.name], used[s.name]) for s in sections}
+
+def log_prompt_cache_usage(usage):
+    """
+    응답의 usage 정보에서 프롬프트 캐시로 처리된 토큰 수를 로그로 남깁니다.
+    고정된 시스템 메시지가 항상 맨 앞에 오므로, 캐시가 적중하면 그만큼 입력 토큰이 절약됩니다.
+    """
+    if usage is None:
+        return 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", 0) or 0) if details is not None else 0
+    logger.info(f" ## Prompt cache: {cached}/{usage.prompt_tokens} prompt tokens served from cache")
+    return cached
@@ -0,0 +1,131 @@
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+# 다시 보내면 성공할 수 있는 HTTP 상태 (요청 시간 초과 / 충돌 / 요청 수 제한 / 서버 오류)
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+# 연결 / 시간 초과 / 요청 수 제한을 나타내는 예외 이름 (openai, pyupbit, tavily 모듈을 불러오지 않고 판별)
+# NonceUsed(pyupbit, 401)는 인증 오류지만 요청마다 새 nonce를 만들므로 다시 보내면 성공할 수 있음
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "TooManyRequests", "TimeoutError", "NonceUsed"}
+
+class TransientError(RuntimeError):
+    """일시적인 실패 (예: 오류를 삼키고 None을 돌려주는 pyupbit 호출) - 재시도 대상"""
+
+def status_of(exc):
+    """예외에서 HTTP 상태 코드를 찾음 (openai: status_code, pyupbit: code, requests: response.status_code)"""
+    for value in (getattr(exc, "status_code", None), getattr(exc, "code", None),
+                  getattr(getattr(exc, "response", None), "status_code", None)):
+        if isinstance(value, int) and value > 0:
+            return value
+    return None
+
+def is_retryable(exc):
+    """
+    예외를 재시도 가능 / 치명적 오류로 분류합니다.
+    - 응답 형식 오류(ValueError, pydantic 검증 오류 포함), 인증 / 잘못된 요청(4xx)은 다시 보내도 같으므로 치명적
+    - 요청 수 제한(429), 서버 오류(5xx), 연결 끊김 / 시간 초과는 재시도
+    """
+    if isinstance(exc, TransientError) or getattr(exc, "retry_after_seconds", None) is not None:
+        return True
+    # 이름으로 판별하는 예외가 상태 코드보다 우선 (NonceUsed는 401이지만 재시도 대상)
+    if any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(exc).__mro__):
+        return True
+    status = status_of(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if isinstance(exc, (ValueError, TypeError, KeyError)):
+        return False
+    # requests의 ConnectionError / Timeout, 내장 ConnectionError / TimeoutError는 모두 OSError
+    return isinstance(exc, OSError)
+
+def retry_after(exc):
+    """서버가 알려준 재시도 대기 시간(초) - Retry-After(초 또는 HTTP 날짜), retry-after-ms, Tavily retry_after_seconds"""
+    seconds = getattr(exc, "retry_after_seconds", None)
+    if seconds is not None:
+        return float(seconds)
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        if value.strip().isdigit():
+            return float(value)
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class RetryPolicy:
+    """
+    외부 호출(OpenAI / 업비트 / Tavily / alternative.me)에 공통으로 쓰는 재시도 정책입니다.
+    - 재시도 가능한 오류만 다시 시도하고, 치명적 오류는 바로 예외를 올림
+    - 지수 백오프 + full jitter (서버가 Retry-After를 주면 그 시간을 따름)
+    - 전체 시간 상한(deadline): 다음 시도까지 기다리면 상한을 넘는 경우 더 기다리지 않고 마지막 오류를 올림
+    """
+
+    def __init__(self, name, max_attempts=3, base_delay=0.5, max_delay=8.0, deadline=20.0):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, attempt, exc=None):
+        """attempt(0부터)번째 실패 후 기다릴 시간(초)"""
+        server_delay = retry_after(exc) if exc is not None else None
+        if server_delay is not None:
+            return server_delay
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, func, *args, deadline_at=None, **kwargs):
+        """
+        func(*args, **kwargs)를 정책에 따라 실행합니다.
+        Parameters:
+        - deadline_at (float): time.monotonic() 기준 절대 상한 (사이클 전체 상한을 함께 적용할 때, 정책 상한보다 이르면 이 값을 사용)
+        Returns:
+        - func의 반환값
+        Raises:
+        - 치명적 오류, 시도 횟수 / 시간 상한을 넘긴 마지막 오류
+        """
+        start = time.monotonic()
+        deadline = start + self.deadline
+        if deadline_at is not None:
+            deadline = min(deadline, deadline_at)
+        for attempt in range(self.max_attempts):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    logger.error(f"{self.name}: fatal error, not retrying ({type(e).__name__}: {e})")
+                    raise
+                if attempt + 1 >= self.max_attempts:
+                    logger.error(f"{self.name}: giving up after {attempt + 1} attempts ({type(e).__name__}: {e})")
+                    raise
+                delay = self.backoff(attempt, e)
+                if time.monotonic() + delay >= deadline:
+                    # deadline_at이 정책 상한보다 이르면 그 값이 실제 예산
+                    logger.error(f"{self.name}: deadline {deadline - start:.2f}s would be exceeded after "
+                                 f"{time.monotonic() - start:.2f}s + {delay:.2f}s backoff, not retrying "
+                                 f"({type(e).__name__}: {e})")
+                    raise
+                logger.warning(f"{self.name}: attempt {attempt + 1}/{self.max_attempts} failed "
+                               f"({type(e).__name__}: {e}), retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+# 서비스별 정책 - 상한은 autotrade_sj_v5.GATHER_SOURCES의 수집 타임아웃보다 짧게
+POLICIES = {
+    "openai": RetryPolicy("openai", max_attempts=3, base_delay=1.0, max_delay=8.0, deadline=60.0),
+    "upbit": RetryPolicy("upbit", max_attempts=3, base_delay=0.2, max_delay=2.0, deadline=6.0),
+    "tavily": RetryPolicy("tavily", max_attempts=3, base_delay=0.5, max_delay=4.0, deadline=10.0),
+    "fear_and_greed": RetryPolicy("fear_and_greed", max_attempts=3, base_delay=0.5, max_delay=4.0, deadline=6.0),
+}
+
+def get_policy(name):
+    """서비스 이름에 해당하는 정책 (등록되지 않은 이름은 기본 설정으로 만들어 등록)"""
+    return POLICIES.setdefault(name, RetryPolicy(name))
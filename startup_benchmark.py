@@ -0,0 +1,82 @@
+import argparse
+import logging
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+def _run_import(module, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", f"import {module}" if module else "pass"]
+    return subprocess.run(command, capture_output=True, text=True)
+
+def import_time_report(module, top=15):
+    """
+    python -X importtime 결과를 최상위 패키지별로 합산해 import 비용을 보고합니다.
+    Parameters:
+    - module (str): 측정할 모듈 이름
+    - top (int): 출력할 패키지 개수
+    Returns:
+    - dict: 패키지 이름 -> 자체 import 시간 합계 (ms), 비용이 큰 순서
+    """
+    result = _run_import(module, importtime=True)
+    if result.returncode != 0:
+        logger.error(f"{module} import 실패:\n{result.stderr[-2000:]}")
+        return {}
+
+    costs = defaultdict(float)
+    total = 0.0
+    for line in result.stderr.splitlines():
+        # 형식: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        costs[package] += int(self_us) / 1000
+        if name.strip() == module:
+            total = int(cumulative_us) / 1000
+
+    costs = dict(sorted(costs.items(), key=lambda item: item[1], reverse=True))
+    logger.info(f"{module} import 총 {total:.1f} ms - 패키지별 비용 상위 {top}개:")
+    for package, ms in list(costs.items())[:top]:
+        logger.info(f"{ms:>10.1f} ms  {package}")
+    return costs
+
+def cold_start(module, runs=5):
+    """
+    새 인터프리터에서 모듈을 import하는 데 걸리는 시간을 runs번 측정합니다 (인터프리터 자체 시작 시간 제외).
+    Returns:
+    - dict: median / min 시간 (초)
+    """
+    def measure(name):
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = _run_import(name)
+            timings.append(time.perf_counter() - start)
+            if result.returncode != 0:
+                raise RuntimeError(f"{name or 'python'} 실행 실패:\n{result.stderr[-2000:]}")
+        return timings
+
+    baseline = statistics.median(measure(None))
+    timings = [t - baseline for t in measure(module)]
+    summary = {"median": statistics.median(timings), "min": min(timings)}
+    logger.info(f"{module} 콜드 스타트 ({runs}회): median={summary['median']:.3f}s, min={summary['min']:.3f}s "
+                f"(인터프리터 시작 {baseline:.3f}s 제외)")
+    return summary
+
+if __name__ == "__main__":
+    # 사용법: python startup_benchmark.py [module] [--runs 5] [--top 15]
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="봇 시작 시간 측정")
+    parser.add_argument("module", nargs="?", default="autotrade_sj_v5")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+    import_time_report(args.module, args.top)
+    cold_start(args.module, args.runs)
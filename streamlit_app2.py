@@ -1,19 +1,36 @@
 import streamlit as st
 import sqlite3
+import threading
 import pandas as pd
 import plotly.express as px
 
-# 데이터베이스 연결 함수
+# 데이터베이스 연결 함수 - 읽기 전용 연결 하나를 모든 rerun / 세션이 공유
+@st.cache_resource
 def get_connection():
-    return sqlite3.connect('trading_decisions.sqlite')
+    return sqlite3.connect('file:trading_decisions.sqlite?mode=ro', uri=True, check_same_thread=False)
+
+# 지금까지 읽은 거래 기록과 마지막 id (rerun마다 새로 추가된 행만 읽어 이어붙임)
+@st.cache_resource
+def get_decision_cache():
+    return {"df": None, "max_id": 0, "lock": threading.Lock()}
 
 # 데이터 로드 함수
 def load_data():
     conn = get_connection()
-    query = "SELECT * FROM decisions"
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    cache = get_decision_cache()
+    with cache["lock"]:
+        (max_id,) = conn.execute("SELECT COALESCE(MAX(id), 0) FROM decisions").fetchone()
+        if max_id < cache["max_id"]:
+            # DB가 새로 만들어진 경우 처음부터 다시 읽음
+            cache["df"], cache["max_id"] = None, 0
+        if cache["df"] is None or max_id > cache["max_id"]:
+            query = "SELECT * FROM decisions WHERE id > ? ORDER BY id"
+            new_rows = pd.read_sql_query(query, conn, params=(cache["max_id"],))
+            cache["df"] = new_rows if cache["df"] is None else pd.concat([cache["df"], new_rows], ignore_index=True)
+            if not new_rows.empty:
+                # 조회 도중 추가된 행까지 읽었을 수 있으므로 실제로 읽은 마지막 id를 기록
+                cache["max_id"] = int(new_rows["id"].max())
+        return cache["df"].copy()
 
 # 수익률 계산 함수
 def calculate_profit(initial_balance: int, current_balance: int) -> float:
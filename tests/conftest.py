@@ -0,0 +1,26 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# 모듈이 저장소 최상위에 평평하게 있으므로 테스트에서 바로 불러올 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def random_ohlcv(n, seed=0, freq='h', start='2020-01-01'):
+    """기하 랜덤워크로 만든 업비트 형식 OHLCV (가격 1억 원 근처)"""
+    rng = np.random.default_rng(seed)
+    close = 1e8 * np.exp(np.cumsum(rng.normal(0, 0.005, n)))
+    open_ = close * np.exp(rng.normal(0, 0.002, n))
+    high = np.maximum(open_, close) * (1 + rng.random(n) * 0.003)
+    low = np.minimum(open_, close) * (1 - rng.random(n) * 0.003)
+    volume = rng.random(n) * 10
+    return pd.DataFrame(
+        {'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume, 'value': volume * close},
+        index=pd.date_range(start, periods=n, freq=freq),
+    )
+
+@pytest.fixture
+def make_ohlcv():
+    return random_ohlcv
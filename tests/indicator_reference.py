@@ -0,0 +1,74 @@
+"""pandas_ta 지표 공식을 pandas로 옮긴 비교 기준 (pandas_ta가 설치되지 않은 환경에서도 정확도 검사용)"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+def sma(close, length):
+    return close.rolling(length, min_periods=length).mean()
+
+def ema(close, length):
+    # pandas_ta.ema(sma=True): 첫 length개의 평균으로 시작하는 ewm(adjust=False)
+    close = close.copy()
+    seed = close.iloc[:length].mean()
+    close.iloc[:length - 1] = np.nan
+    close.iloc[length - 1] = seed
+    return close.ewm(span=length, adjust=False).mean()
+
+def rma(close, length):
+    return close.ewm(alpha=1 / length, min_periods=length).mean()
+
+def rsi(close, length=14):
+    negative = close.diff(1)
+    positive = negative.copy()
+    positive[positive < 0] = 0
+    negative[negative > 0] = 0
+    gain, loss = rma(positive, length), rma(negative, length)
+    return 100 * gain / (gain + loss.abs())
+
+def stoch(high, low, close, k=14, d=3, smooth_k=3):
+    lowest, highest = low.rolling(k).min(), high.rolling(k).max()
+    price_range = (highest - lowest).replace(0, sys.float_info.epsilon)
+    raw = 100 * (close - lowest) / price_range
+    stoch_k = sma(raw.loc[raw.first_valid_index():], smooth_k)
+    stoch_d = sma(stoch_k.loc[stoch_k.first_valid_index():], d)
+    return stoch_k.reindex(close.index), stoch_d.reindex(close.index)
+
+def macd(close, fast=12, slow=26, signal=9):
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(line.loc[line.first_valid_index():], signal).reindex(close.index)
+    return line, line - signal_line, signal_line
+
+def bbands(close, length=5, std=2.0, ddof=0):
+    middle = sma(close, length)
+    deviation = close.rolling(length).std(ddof=ddof)
+    lower, upper = middle - std * deviation, middle + std * deviation
+    return lower, middle, upper, 100 * (upper - lower) / middle, (close - lower) / (upper - lower)
+
+def atr(high, low, close, length=14):
+    previous_close = close.shift(1)
+    true_range = pd.concat([high - low, high - previous_close, previous_close - low], axis=1).abs().max(axis=1)
+    true_range.iloc[:1] = np.nan
+    return rma(true_range, length)
+
+def obv(close, volume):
+    direction = close.diff().apply(np.sign)
+    direction.iloc[0] = 1
+    return (direction * volume).cumsum()
+
+def bot_indicators(df):
+    """기존 autotrade add_indicators와 같은 컬럼 (MACD / 볼린저 밴드는 pandas ewm / rolling std 방식)"""
+    df = df.copy()
+    df['SMA_7'] = sma(df['close'], 7)
+    for length in (7, 14, 35):
+        df[f'EMA_{length}'] = ema(df['close'], length)
+    df['RSI_14'] = rsi(df['close'], 14)
+    df['STOCHk_14_3_3'], df['STOCHd_14_3_3'] = stoch(df['high'], df['low'], df['close'])
+    df['MACD'] = df['close'].ewm(span=12, adjust=False).mean() - df['close'].ewm(span=26, adjust=False).mean()
+    df['Signal_Line'] = df['MACD'].ewm(span=9, adjust=False).mean()
+    df['MACD_Histogram'] = df['MACD'] - df['Signal_Line']
+    df['Middle_Band'] = df['close'].rolling(window=20).mean()
+    std_dev = df['close'].rolling(window=20).std()
+    df['Upper_Band'] = df['Middle_Band'] + std_dev * 2
+    df['Lower_Band'] = df['Middle_Band'] - std_dev * 2
+    return df
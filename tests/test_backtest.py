@@ -0,0 +1,89 @@
+import json
+
+import pandas as pd
+import pytest
+
+from backtest import (
+    MIN_ORDER_KRW, ORDER_FEE_FACTOR, UPBIT_FEE_RATE, ModelDecider, RecordedDecider, SimulatedAccount, run_backtest,
+)
+from indicators import INDICATOR_WARMUP_BARS
+from market_data import MARKET_DATA_ROWS
+
+PRICE = 100_000_000.0
+
+def test_buy_applies_order_factor_and_fee():
+    account = SimulatedAccount(1_000_000.0)
+    bought, order = account.buy(50, PRICE)
+    # execute_buy: 잔고 × 비율 × 0.9995로 주문하고, 체결 금액의 수수료는 따로 빠짐
+    assert order == pytest.approx(500_000 * ORDER_FEE_FACTOR)
+    assert bought == pytest.approx(order / PRICE)
+    assert account.krw == pytest.approx(1_000_000 - order * (1 + UPBIT_FEE_RATE))
+    assert account.btc == pytest.approx(bought)
+    assert account.avg_buy_price == pytest.approx(PRICE)
+
+def test_average_buy_price_is_volume_weighted():
+    account = SimulatedAccount(1_000_000.0)
+    first, _ = account.buy(50, PRICE)
+    second, _ = account.buy(100, PRICE / 2)
+    assert account.avg_buy_price == pytest.approx((first * PRICE + second * PRICE / 2) / (first + second))
+
+def test_sell_credits_proceeds_net_of_fee():
+    account = SimulatedAccount(0.0, btc=0.01)
+    sold, proceeds = account.sell(40, PRICE)
+    assert sold == pytest.approx(0.004)
+    assert proceeds == pytest.approx(0.004 * PRICE * (1 - UPBIT_FEE_RATE))
+    assert account.krw == pytest.approx(proceeds)
+    assert account.btc == pytest.approx(0.006)
+
+def test_minimum_order_on_both_sides():
+    # execute_buy / execute_sell처럼 5000원을 "넘어야" 주문 (정확히 5000원은 주문하지 않음)
+    account = SimulatedAccount(float(MIN_ORDER_KRW))
+    assert account.buy(100, PRICE) is None
+    assert account.krw == MIN_ORDER_KRW and account.btc == 0
+    assert SimulatedAccount(MIN_ORDER_KRW + 1.0).buy(100, PRICE) is not None
+
+    account = SimulatedAccount(0.0, btc=MIN_ORDER_KRW / PRICE)
+    assert account.sell(100, PRICE) is None
+    assert account.btc == MIN_ORDER_KRW / PRICE and account.krw == 0
+    assert SimulatedAccount(0.0, btc=(MIN_ORDER_KRW + 1) / PRICE).sell(100, PRICE) is not None
+
+def test_run_backtest_matches_account(make_ohlcv):
+    df = make_ohlcv(INDICATOR_WARMUP_BARS + 60)
+    buy_at, sell_at = df.index[INDICATOR_WARMUP_BARS + 6], df.index[INDICATOR_WARMUP_BARS + 30]
+    to_ms = lambda ts: int(pd.Timestamp(ts).tz_localize('Asia/Seoul').timestamp() * 1000)
+    decider = RecordedDecider([
+        {'timestamp': to_ms(buy_at), 'decision': 'buy', 'percentage': 60},
+        {'timestamp': to_ms(sell_at), 'decision': 'sell', 'percentage': 100},
+    ])
+    result = run_backtest(df, decider, initial_krw=1_000_000)
+
+    expected = SimulatedAccount(1_000_000.0)
+    expected.buy(60, df.loc[buy_at, 'close'])
+    expected.sell(100, df.loc[sell_at, 'close'])
+    assert list(result.trades['decision']) == ['buy', 'sell']
+    assert result.equity.iloc[-1] == pytest.approx(expected.krw)
+
+def test_model_decider_prepares_bot_market_data(make_ohlcv):
+    history = make_ohlcv(4000, freq='h')
+    payload = json.loads(ModelDecider(None).prepare_data(history))
+    assert set(payload) == set(MARKET_DATA_ROWS)
+    for name, (_, rows) in MARKET_DATA_ROWS.items():
+        table = payload[name]
+        assert len(table["data"]) == rows
+        assert "RSI_14" in table["columns"] and "MACD" in table["columns"]
+    # 시간봉은 결정 시점 봉까지, 일봉은 업비트처럼 한국 시간 09:00 경계
+    assert payload["hourly"]["data"][-1][0] == int(pd.Timestamp(history.index[-1]).timestamp())
+    assert all(pd.Timestamp(row[0], unit='s').hour == 9 for row in payload["daily"]["data"])
+
+def test_model_decider_in_backtest(make_ohlcv):
+    df = make_ohlcv(4000, freq='h')
+    statuses = []
+
+    def analyze(data_json, current_status):
+        statuses.append(json.loads(current_status))
+        return '{"decision": "buy", "percentage": 10, "reason": "test"}'
+
+    result = run_backtest(df.iloc[:3700 + 13], ModelDecider(analyze), step=6, warmup=3700)
+    assert len(result.trades) == 3
+    assert statuses[0]['krw_balance'] == 1_000_000
+    assert statuses[1]['btc_balance'] == pytest.approx(result.trades['btc'].iloc[0])
@@ -0,0 +1,52 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from candle_store import CandleStore
+
+@pytest.fixture
+def store(tmp_path, make_ohlcv, monkeypatch):
+    store = CandleStore(str(tmp_path / "candles.sqlite"))
+    history = {interval: make_ohlcv(300, freq=freq) for interval, freq in (("day", "D"), ("minute60", "h"))}
+    store.calls = []
+    store.active = 0
+    store.max_active = 0
+    counter_lock = threading.Lock()
+
+    def fetch(ticker, interval, count):
+        # 네트워크 요청 대신 느린 가짜 응답 - 동시에 몇 개가 진행 중인지 기록
+        with counter_lock:
+            store.calls.append((interval, count))
+            store.active += 1
+            store.max_active = max(store.max_active, store.active)
+        time.sleep(0.2)
+        with counter_lock:
+            store.active -= 1
+        return history[interval].tail(count)
+
+    monkeypatch.setattr(store, "_fetch", fetch)
+    return store
+
+def test_different_intervals_fetch_concurrently(store):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(store.get_ohlcv, "KRW-BTC", interval, 100) for interval in ("day", "minute60")]
+        results = [future.result() for future in futures]
+    assert store.max_active == 2
+    assert [len(df) for df in results] == [100, 100]
+
+def test_same_interval_is_serialized(store):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(store.get_ohlcv, "KRW-BTC", "day", 100) for _ in range(2)]
+        for future in futures:
+            future.result()
+    assert store.max_active == 1
+    # 두 번째 호출은 첫 호출이 저장한 봉을 보고 최신 봉만 요청
+    assert store.calls == [("day", 100), ("day", 2)]
+
+def test_returns_stored_candles(store):
+    first = store.get_ohlcv("KRW-BTC", "minute60", 50)
+    second = store.get_ohlcv("KRW-BTC", "minute60", 50)
+    assert first.equals(second)
+    assert list(first.columns) == ['open', 'high', 'low', 'close', 'volume', 'value']
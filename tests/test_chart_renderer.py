@@ -0,0 +1,29 @@
+import io
+
+import pytest
+
+from chart_renderer import UP, DOWN, render_chart_png
+from indicators import add_indicators
+
+Image = pytest.importorskip("PIL.Image")
+
+@pytest.fixture
+def chart_df(make_ohlcv):
+    return add_indicators(make_ohlcv(200, freq='4h')).tail(120)
+
+def test_renders_png_of_requested_size(chart_df):
+    png = render_chart_png(chart_df, width=1000, height=600)
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+    assert Image.open(io.BytesIO(png)).size == (1000, 600)
+
+def test_same_input_gives_same_image(chart_df):
+    assert render_chart_png(chart_df) == render_chart_png(chart_df.copy())
+
+def test_draws_both_candle_colors(chart_df):
+    colors = {color for _, color in Image.open(io.BytesIO(render_chart_png(chart_df))).getcolors(1 << 16)}
+    assert UP in colors and DOWN in colors
+
+def test_warmup_nan_rows_do_not_break_rendering(make_ohlcv):
+    # 지표가 아직 NaN인 앞쪽 행이 섞여 있어도 렌더링되어야 함
+    png = render_chart_png(add_indicators(make_ohlcv(60, freq='4h')))
+    assert Image.open(io.BytesIO(png)).size == (1280, 800)
@@ -0,0 +1,38 @@
+import pytest
+
+from decision_schema import TradingDecision, normalize_decision, parse_decision, response_format
+
+def test_valid_response_passes_unchanged():
+    decision = parse_decision('{"decision": "buy", "percentage": 30, "reason": "breakout"}')
+    assert decision == TradingDecision(decision="buy", percentage=30, reason="breakout")
+
+@pytest.mark.parametrize("advice, expected", [
+    ('```json\n{"Decision": "SELL", "percentage": "40%", "reason": "r"}\n```', ("sell", 40)),
+    ('{"decision": "buy", "percentage": 29.6, "reason": "r", "confidence": 0.8}', ("buy", 30)),
+    ('{"decision": "hold", "reason": "r"}', ("hold", 0)),
+])
+def test_near_misses_are_repaired(advice, expected):
+    decision = parse_decision(advice)
+    assert (decision.decision.value, decision.percentage) == expected
+
+@pytest.mark.parametrize("percentage", ['150', '-5', '"lots"', 'null'])
+@pytest.mark.parametrize("side", ["buy", "sell"])
+def test_invalid_trade_percentage_downgrades_to_hold(side, percentage):
+    # 비율을 100으로 채우면 매도 시 전량 청산이 되므로 hold로 바꿈
+    decision = parse_decision(f'{{"decision": "{side}", "percentage": {percentage}, "reason": "r"}}')
+    assert (decision.decision.value, decision.percentage) == ("hold", 0)
+    assert side in decision.reason
+
+def test_missing_trade_percentage_downgrades_to_hold():
+    assert parse_decision('{"decision": "sell", "reason": "r"}').decision.value == "hold"
+
+@pytest.mark.parametrize("advice", [None, "", "no json", '{"decision": "maybe", "percentage": 10, "reason": "r"}'])
+def test_unrepairable_responses(advice):
+    assert parse_decision(advice) is None
+    assert normalize_decision(advice) is None
+
+def test_response_format_is_strict_schema():
+    schema = response_format()["json_schema"]
+    assert schema["strict"] is True
+    assert schema["schema"]["additionalProperties"] is False
+    assert schema["schema"]["properties"]["percentage"]["maximum"] == 100
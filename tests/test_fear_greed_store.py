@@ -0,0 +1,38 @@
+import time
+
+import pytest
+import requests
+
+import retry_policy
+from fear_greed_store import DAY_SECONDS, FearGreedStore
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # 재시도 대기 없이 바로 실패하도록
+    monkeypatch.setitem(retry_policy.POLICIES, "fear_and_greed", retry_policy.RetryPolicy("fear_and_greed", max_attempts=1))
+    return FearGreedStore(str(tmp_path / "fear_greed.sqlite"))
+
+def days(count, last_ts):
+    return [(last_ts - i * DAY_SECONDS, 50 + i, "Neutral") for i in range(count)]
+
+def fail(limit):
+    raise requests.ConnectionError("offline")
+
+def test_fetch_failure_serves_stored_days(store, monkeypatch):
+    today = int(time.time()) // DAY_SECONDS * DAY_SECONDS
+    monkeypatch.setattr(store, "_fetch", lambda limit: days(limit, today - 2 * DAY_SECONDS))
+    assert len(store.get_series(limit=30).splitlines()) == 30
+
+    store._memory.clear()
+    monkeypatch.setattr(store, "_fetch", fail)
+    assert len(store.get_series(limit=30).splitlines()) == 30
+    # 실패한 결과는 메모리에 남기지 않아 다음 호출에서 다시 받아봄
+    calls = []
+    monkeypatch.setattr(store, "_fetch", lambda limit: calls.append(limit) or days(limit, today))
+    store.get_series(limit=30)
+    assert calls == [3]
+
+def test_fetch_failure_without_stored_days_raises(store, monkeypatch):
+    monkeypatch.setattr(store, "_fetch", fail)
+    with pytest.raises(requests.ConnectionError):
+        store.get_series(limit=30)
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from hedged_request import DeadlineExceeded, LatencyTracker, hedged_call
+
+def respond(value, delay=0.0, calls=None):
+    def call():
+        if calls is not None:
+            calls.append(value)
+        time.sleep(delay)
+        return value
+    return call
+
+def fail(exc, delay=0.0, calls=None):
+    def call():
+        if calls is not None:
+            calls.append(exc)
+        time.sleep(delay)
+        raise exc
+    return call
+
+class HTTPStatusError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+
+def test_fast_primary_wins_without_hedge():
+    calls = []
+    assert hedged_call(respond("a"), respond("b", calls=calls), hedge_after=0.5, deadline=2) == ("a", "primary")
+    assert calls == []
+
+def test_slow_primary_is_hedged():
+    assert hedged_call(respond("a", 1.0), respond("b", 0.05), hedge_after=0.1, deadline=2) == ("b", "hedge")
+
+def test_invalid_primary_response_is_hedged():
+    result = hedged_call(respond("bad"), respond("good"), hedge_after=5, deadline=2, validate=lambda v: v == "good")
+    assert result == ("good", "hedge")
+
+def test_deadline_exceeded():
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        hedged_call(respond("a", 2), respond("b", 2), hedge_after=0.05, deadline=0.3)
+    assert time.monotonic() - start < 1.0
+
+def test_fatal_primary_error_is_not_hedged():
+    calls = []
+    with pytest.raises(HTTPStatusError):
+        hedged_call(fail(HTTPStatusError(401)), respond("b", calls=calls), hedge_after=5, deadline=2)
+    assert calls == []
+
+def test_retryable_primary_error_is_hedged():
+    assert hedged_call(fail(HTTPStatusError(503)), respond("b"), hedge_after=5, deadline=2) == ("b", "hedge")
+
+def test_censored_primary_durations_are_recorded():
+    tracker = LatencyTracker(min_samples=1)
+    # hedge가 이긴 경우 primary는 그때까지의 경과 시간으로 한 번만 기록
+    hedged_call(respond("a", 0.5), respond("b"), hedge_after=0.2, deadline=2, tracker=tracker)
+    time.sleep(0.5)
+    assert len(tracker._samples) == 1 and tracker._samples[0] >= 0.2
+    # 시간 상한 / 실패도 기록
+    with pytest.raises(DeadlineExceeded):
+        hedged_call(respond("a", 1), respond("b", 1), hedge_after=0.05, deadline=0.2, tracker=tracker)
+    with pytest.raises(HTTPStatusError):
+        hedged_call(fail(HTTPStatusError(400), 0.1), None, hedge_after=5, deadline=2, tracker=tracker)
+    time.sleep(1)
+    assert len(tracker._samples) == 3
+    assert tracker._samples[1] >= 0.2 and tracker._samples[2] >= 0.1
+
+def test_tracker_percentile():
+    tracker = LatencyTracker(percentile=0.9, min_samples=5, default=30.0)
+    for seconds in range(1, 5):
+        tracker.record(seconds)
+    assert tracker.threshold() == 30.0
+    for seconds in range(5, 11):
+        tracker.record(seconds)
+    assert tracker.threshold() == 10
@@ -0,0 +1,90 @@
+import base64
+import io
+
+import numpy as np
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from image_encoding import (
+    AUTO_FORMATS, compare_encodings, detect_image_format, encode_image, encode_image_bytes, image_mime_type,
+)
+
+def to_png(img):
+    buffered = io.BytesIO()
+    img.save(buffered, format="PNG")
+    return buffered.getvalue()
+
+def decode(data):
+    return Image.open(io.BytesIO(data))
+
+@pytest.fixture
+def chart_png():
+    # 흰 여백 안에 단색 면과 선이 있는 차트 모양 이미지 (1600x1000, 차트 영역 100..1499 x 50..949)
+    img = Image.new("RGB", (1600, 1000), "white")
+    pixels = np.asarray(img).copy()
+    pixels[50:950, 100:1500] = (19, 23, 34)
+    for x in range(120, 1480, 20):
+        top = 300 + (x * 7) % 400
+        pixels[top:top + 200, x:x + 10] = (38, 166, 154) if x % 40 else (239, 83, 80)
+    return to_png(Image.fromarray(pixels))
+
+@pytest.fixture
+def photo_png():
+    # 그라데이션과 잡음이 많은 스크린샷 모양 이미지
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, 400)[None, :, None] * np.ones((300, 1, 3))
+    pixels = np.clip(gradient + rng.normal(0, 20, (300, 400, 3)), 0, 255).astype(np.uint8)
+    return to_png(Image.fromarray(pixels))
+
+def test_resize_keeps_aspect_ratio(chart_png):
+    img = decode(encode_image_bytes(chart_png, max_size=(800, 800)))
+    assert img.size == (800, 500)
+
+def test_crop_box_and_auto_crop(chart_png):
+    assert decode(encode_image_bytes(chart_png, crop_box=(0, 0, 400, 300))).size == (400, 300)
+    # 좌상단과 같은 색의 여백만 잘라 차트 영역이 남음
+    assert decode(encode_image_bytes(chart_png, auto_crop=True)).size == (1400, 900)
+
+def test_palette_reduces_colors(photo_png):
+    img = decode(encode_image_bytes(photo_png, palette_colors=16))
+    assert img.mode == "P"
+    assert len(img.convert("RGB").getcolors(1 << 16)) <= 16
+
+@pytest.mark.parametrize("image_format", ["PNG", "JPEG", "WEBP"])
+def test_output_format_and_mime(chart_png, image_format):
+    encoded = encode_image_bytes(chart_png, image_format=image_format.lower(), max_size=(640, 640))
+    assert decode(encoded).format == image_format
+    assert detect_image_format(encoded) == image_format
+    assert detect_image_format(base64.b64encode(encoded).decode()) == image_format
+    assert image_mime_type(image_format.lower()) == f"image/{image_format.lower()}"
+
+def test_unsupported_format_raises(chart_png):
+    with pytest.raises(ValueError):
+        encode_image_bytes(chart_png, image_format="GIF")
+
+def test_auto_picks_smallest_format(chart_png, photo_png, make_ohlcv):
+    options = {"max_size": (640, 640), "quality": 80, "palette_colors": 64}
+    for png in (chart_png, photo_png):
+        sizes = {name: len(encode_image_bytes(png, image_format=name, **options)) for name in AUTO_FORMATS}
+        auto = encode_image_bytes(png, image_format="AUTO", **options)
+        assert len(auto) == min(sizes.values())
+        assert detect_image_format(auto) == min(sizes, key=sizes.get)
+    # 렌더링한 차트는 팔레트 PNG, 잡음이 많은 이미지는 손실 압축이 작음
+    from chart_renderer import render_chart_png
+    from indicators import add_indicators
+    rendered = render_chart_png(add_indicators(make_ohlcv(200, freq='4h')).tail(120))
+    assert detect_image_format(encode_image_bytes(rendered, image_format="AUTO", palette_colors=64)) == "PNG"
+    assert detect_image_format(encode_image_bytes(photo_png, image_format="AUTO", **options)) != "PNG"
+
+def test_encode_image_returns_base64(chart_png):
+    encoded = encode_image(chart_png, max_size=(640, 640), image_format="WEBP")
+    assert base64.b64decode(encoded) == encode_image_bytes(chart_png, max_size=(640, 640), image_format="WEBP")
+
+def test_compare_encodings_reports_base64_sizes(chart_png):
+    variants = {"small_webp": {"max_size": (320, 320), "image_format": "WEBP"}, "png": {}}
+    sizes = compare_encodings(chart_png, variants)
+    assert set(sizes) == {"original", "small_webp", "png"}
+    assert sizes["original"] == len(base64.b64encode(chart_png))
+    assert sizes["small_webp"] == len(base64.b64encode(encode_image_bytes(chart_png, **variants["small_webp"])))
+    assert sizes["small_webp"] < sizes["original"]
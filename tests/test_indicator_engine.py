@@ -0,0 +1,67 @@
+import math
+import pickle
+
+import numpy as np
+
+from indicator_engine import INDICATOR_COLUMNS, IndicatorEngine, max_relative_error
+from indicators import add_indicators
+
+TOLERANCE = 1e-9
+
+def assert_matches_batch(engine_df, df, rows=slice(None)):
+    """엔진 결과가 전체 df로 한 번에 계산한 add_indicators 결과와 같은지 (rows 구간만 비교)"""
+    batch = add_indicators(df.copy())
+    errors = max_relative_error(engine_df[rows], batch[rows])
+    assert all(error <= TOLERANCE for error in errors.values()), errors
+
+def test_bar_by_bar_matches_batch(make_ohlcv):
+    df = make_ohlcv(500)
+    engine = IndicatorEngine()
+    rows = [engine.update(bar) for bar in df[['high', 'low', 'close']].to_dict('records')]
+    engine_df = df.assign(**{column: [row[column] for row in rows] for column in INDICATOR_COLUMNS})
+    assert_matches_batch(engine_df, df)
+
+def test_update_frame_only_adds_new_bars(make_ohlcv):
+    df = make_ohlcv(400)
+    engine = IndicatorEngine()
+    engine.update_frame(df.iloc[:300], last_closed=True)
+    assert engine.last_timestamp == df.index[299]
+    # 겹치는 구간을 다시 넘겨도 이미 반영한 봉은 건너뜀
+    result = engine.update_frame(df.iloc[250:], last_closed=True)
+    assert_matches_batch(result, df, rows=slice(df.index[250], None))
+
+def test_provisional_bar_is_rolled_back(make_ohlcv):
+    df = make_ohlcv(300)
+    rng = np.random.default_rng(1)
+    engine = IndicatorEngine()
+    rows = []
+    for timestamp, bar in zip(df.index, df[['high', 'low', 'close']].to_dict('records')):
+        # 봉이 마감되기 전 진행 중인 값으로 여러 번 갱신한 뒤 마감 값을 반영
+        for _ in range(3):
+            tick = {key: value * (1 + rng.normal(0, 0.01)) for key, value in bar.items()}
+            engine.update(tick, timestamp, closed=False)
+        rows.append(engine.update(bar, timestamp))
+    engine_df = df.assign(**{column: [row[column] for row in rows] for column in INDICATOR_COLUMNS})
+    assert_matches_batch(engine_df, df)
+
+def test_update_frame_treats_last_bar_as_provisional(make_ohlcv):
+    df = make_ohlcv(300)
+    engine = IndicatorEngine()
+    # 마지막 봉이 진행 중인 상태로 한 번 계산
+    in_progress = df.iloc[:200].copy()
+    in_progress.iloc[-1, in_progress.columns.get_loc('close')] *= 1.05
+    engine.update_frame(in_progress)
+    assert engine.last_timestamp == df.index[198]
+    # 같은 봉이 마감된 값으로 다시 들어오면 진행 중 값은 되돌리고 다시 계산
+    result = engine.update_frame(df, last_closed=True)
+    assert_matches_batch(result, df, rows=slice(df.index[199], None))
+
+def test_pickled_engine_continues(make_ohlcv):
+    df = make_ohlcv(300)
+    engine = IndicatorEngine()
+    engine.update_frame(df.iloc[:150], last_closed=True)
+    restored = pickle.loads(pickle.dumps(engine))
+    ours = restored.update(df.iloc[150][['high', 'low', 'close']])
+    expected = add_indicators(df.iloc[:151].copy()).iloc[-1]
+    for column in INDICATOR_COLUMNS:
+        assert math.isclose(ours[column], expected[column], rel_tol=TOLERANCE)
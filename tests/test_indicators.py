@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import indicator_reference as reference
+import indicators
+from indicator_engine import INDICATOR_COLUMNS, IndicatorEngine, max_relative_error
+
+TOLERANCE = 1e-7
+N_BARS = 5000
+
+@pytest.fixture
+def df(make_ohlcv):
+    return make_ohlcv(N_BARS)
+
+def frame(columns, index):
+    return pd.DataFrame({name: np.asarray(values, dtype=float) for name, values in columns.items()}, index=index)
+
+def assert_close(ours, theirs):
+    errors = max_relative_error(ours, theirs, columns=list(theirs.columns))
+    assert all(error <= TOLERANCE for error in errors.values()), errors
+
+def test_kernels_match_reference(df):
+    high, low, close, volume = df['high'], df['low'], df['close'], df['volume']
+    stoch = indicators.stoch(high, low, close)
+    macd = indicators.macd(close)
+    bbands = indicators.bbands(close, length=20)
+    ours = frame({
+        'sma': indicators.sma(close, 7),
+        'ema': indicators.ema(close, 14),
+        'rsi': indicators.rsi(close, 14),
+        'stoch_k': stoch['STOCHk_14_3_3'], 'stoch_d': stoch['STOCHd_14_3_3'],
+        'macd': macd['MACD_12_26_9'], 'macd_h': macd['MACDh_12_26_9'], 'macd_s': macd['MACDs_12_26_9'],
+        'bbl': bbands['BBL_20_2.0'], 'bbm': bbands['BBM_20_2.0'], 'bbu': bbands['BBU_20_2.0'],
+        'bbb': bbands['BBB_20_2.0'], 'bbp': bbands['BBP_20_2.0'],
+        'bb_width': indicators.bb_width(close),
+        'atr': indicators.atr(high, low, close),
+        'obv': indicators.obv(close, volume),
+    }, df.index)
+    stoch_k, stoch_d = reference.stoch(high, low, close)
+    macd_line, macd_h, macd_s = reference.macd(close)
+    bbl, bbm, bbu, bbb, bbp = reference.bbands(close, length=20)
+    theirs = frame({
+        'sma': reference.sma(close, 7),
+        'ema': reference.ema(close, 14),
+        'rsi': reference.rsi(close, 14),
+        'stoch_k': stoch_k, 'stoch_d': stoch_d,
+        'macd': macd_line, 'macd_h': macd_h, 'macd_s': macd_s,
+        'bbl': bbl, 'bbm': bbm, 'bbu': bbu, 'bbb': bbb, 'bbp': bbp,
+        'bb_width': bbb,
+        'atr': reference.atr(high, low, close),
+        'obv': reference.obv(close, volume),
+    }, df.index)
+    assert_close(ours, theirs)
+
+def test_array_input_returns_arrays(df):
+    close = df['close'].to_numpy()
+    assert isinstance(indicators.sma(close, 7), np.ndarray)
+    np.testing.assert_allclose(indicators.sma(close, 7), indicators.sma(df['close'], 7).to_numpy(), equal_nan=True)
+
+def test_add_indicators_matches_reference(df):
+    ours = indicators.add_indicators(df.copy())
+    assert_close(ours[INDICATOR_COLUMNS], reference.bot_indicators(df)[INDICATOR_COLUMNS])
+
+def test_engine_matches_reference(df):
+    ours = IndicatorEngine(history_size=N_BARS).update_frame(df, last_closed=True)
+    assert_close(ours, reference.bot_indicators(df)[INDICATOR_COLUMNS])
+
+def test_long_history_keeps_precision(make_ohlcv):
+    # 블록 단위 누적합 / 재귀가 긴 이력에서도 정밀도를 유지하는지 (BLOCK_ROWS보다 긴 구간)
+    df = make_ohlcv(indicators.BLOCK_ROWS * 2 + 123)
+    assert_close(indicators.add_indicators(df.copy())[INDICATOR_COLUMNS], reference.bot_indicators(df)[INDICATOR_COLUMNS])
+
+def test_matches_pandas_ta(df):
+    pytest.importorskip("pandas_ta")
+    assert_close(indicators.add_indicators(df.copy())[INDICATOR_COLUMNS],
+                 indicators._pandas_ta_indicators(df.copy())[INDICATOR_COLUMNS])
+
+@pytest.mark.parametrize("length", [1, 2, 3, 14, 20])
+def test_rolling_extreme_matches_pandas(df, length):
+    low, high = df['low'], df['high']
+    np.testing.assert_array_equal(indicators._rolling_extreme(low.to_numpy(), length, np.minimum),
+                                  low.rolling(length).min().to_numpy())
+    np.testing.assert_array_equal(indicators._rolling_extreme(high.to_numpy(), length, np.maximum),
+                                  high.rolling(length).max().to_numpy())
+
+def test_rolling_std_high_volatility():
+    # 누적합 방식이 변동성이 큰 긴 이력에서도 창마다 편차를 직접 더한 값과 같은지 (앞쪽 NaN 포함)
+    rng = np.random.default_rng(3)
+    close = 1e8 * np.exp(np.cumsum(rng.normal(0, 0.03, 50000)))
+    close[:5] = np.nan
+    windows = np.lib.stride_tricks.sliding_window_view(close[5:], 20)
+    expected = np.concatenate((np.full(24, np.nan), windows.std(axis=1, ddof=1)))
+    np.testing.assert_allclose(indicators._rolling_std(close, 20, ddof=1), expected, rtol=1e-9, equal_nan=True)
@@ -0,0 +1,50 @@
+import sqlite3
+
+import pytest
+
+from decision_schema import normalize_decision
+from llm_cache import CacheMiss, LLMResponseCache
+
+MESSAGES = [{"role": "user", "content": "market data"}]
+PARAMS = {"temperature": 0.6}
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "llm_cache.sqlite")
+
+def test_record_stores_normalized_repaired_response(db_path):
+    raw = '```json\n{"Decision": "SELL", "percentage": "40%", "reason": "trend"}\n```'
+    recorder = LLMResponseCache(db_path, mode="record")
+    advice, model = recorder.complete("gpt", MESSAGES, PARAMS, lambda: (raw, "gpt"), normalize=normalize_decision)
+    assert advice == '{"decision":"sell","percentage":40,"reason":"trend"}'
+    assert model == "gpt"
+    # 같은 요청은 API를 다시 부르지 않고 저장된 정규화 응답을 재생
+    replay = LLMResponseCache(db_path, mode="replay")
+    assert replay.complete("gpt", MESSAGES, PARAMS, pytest.fail, normalize=normalize_decision) == (advice, "gpt")
+
+def test_records_model_that_answered(db_path):
+    # hedge 모델이 답한 응답은 요청 키는 그대로, 응답한 모델은 hedge 모델로 기록하고 재생할 때도 알려줌
+    answer = '{"decision":"hold","percentage":0,"reason":"hedge"}'
+    recorder = LLMResponseCache(db_path, mode="record")
+    assert recorder.complete("gpt", MESSAGES, PARAMS, lambda: (answer, "o1-mini")) == (answer, "o1-mini")
+    assert LLMResponseCache(db_path, mode="replay").complete("gpt", MESSAGES, PARAMS, pytest.fail) == (answer, "o1-mini")
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute('SELECT model FROM llm_cache').fetchall() == [("o1-mini",)]
+
+def test_unrepairable_response_is_not_stored(db_path):
+    recorder = LLMResponseCache(db_path, mode="record")
+    advice, _ = recorder.complete("gpt", MESSAGES, PARAMS, lambda: ("no json here", "gpt"), normalize=normalize_decision)
+    assert advice == "no json here"
+    with pytest.raises(CacheMiss):
+        LLMResponseCache(db_path, mode="replay").complete("gpt", MESSAGES, PARAMS, pytest.fail)
+
+def test_replay_miss_raises(db_path):
+    with pytest.raises(CacheMiss):
+        LLMResponseCache(db_path, mode="replay").complete("gpt", MESSAGES, {"temperature": 0.1}, pytest.fail)
+
+def test_live_mode_always_calls(db_path):
+    calls = []
+    cache = LLMResponseCache(db_path, mode="live")
+    for _ in range(2):
+        cache.complete("gpt", MESSAGES, PARAMS, lambda: (calls.append(1) or "{}", "gpt"))
+    assert len(calls) == 2
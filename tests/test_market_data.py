@@ -0,0 +1,43 @@
+import json
+import math
+
+import pandas as pd
+
+from indicators import add_indicators
+from market_data import compare_payloads, frame_to_columnar, legacy_market_data, serialize_market_data
+
+def make_frames(make_ohlcv):
+    return {
+        "daily": add_indicators(make_ohlcv(60, freq='D')),
+        "hourly": add_indicators(make_ohlcv(60, freq='h', seed=1)),
+    }
+
+def test_compare_payloads_reports_both_encodings(make_ohlcv):
+    frames = make_frames(make_ohlcv)
+    report = compare_payloads(frames)
+    legacy, compact = legacy_market_data(frames), serialize_market_data(frames)
+    assert report["legacy"][0] == len(legacy.encode('utf-8'))
+    assert report["compact"][0] == len(compact.encode('utf-8'))
+    # 이중 인코딩을 없앤 컬럼형이 크기와 토큰 수 모두 작아야 함
+    assert report["compact"][0] < report["legacy"][0]
+    assert report["compact"][1] < report["legacy"][1]
+
+def test_payload_is_encoded_once(make_ohlcv):
+    payload = json.loads(serialize_market_data(make_frames(make_ohlcv)))
+    assert isinstance(payload, dict) and set(payload) == {"daily", "hourly"}
+    assert '\\"' not in serialize_market_data(make_frames(make_ohlcv))
+    legacy = json.loads(legacy_market_data(make_frames(make_ohlcv)))
+    assert isinstance(legacy, str)  # 기존 방식은 JSON 안의 JSON 문자열
+
+def test_columnar_rows_drop_warmup_and_round(make_ohlcv):
+    df = add_indicators(make_ohlcv(60, freq='h'))
+    table = frame_to_columnar(df, decimals=2)
+    assert table["columns"][0] == "timestamp"
+    # 모든 지표가 NaN인 첫 행은 제외 (첫 행부터 close 기반 지표는 없음)
+    first_kept = df.index[df.drop(columns=['open', 'high', 'low', 'close', 'volume', 'value']).notna().any(axis=1)][0]
+    assert table["data"][0][0] == int(pd.Timestamp(first_kept).timestamp())
+    for row in table["data"]:
+        for value in row[1:]:
+            assert value is None or (isinstance(value, (int, float)) and not math.isnan(value))
+            if isinstance(value, float):
+                assert round(value, 2) == value
@@ -0,0 +1,76 @@
+import sys
+import time
+
+import pytest
+
+pytest.importorskip("websockets")
+
+from market_feed import MarketFeed
+from market_replay import ReplayServer
+from market_snapshot import MarketSnapshotCache
+
+UNITS = [
+    {"ask_price": 100_100_000.0, "bid_price": 100_000_000.0, "ask_size": 0.5, "bid_size": 0.7},
+    {"ask_price": 100_200_000.0, "bid_price": 99_900_000.0, "ask_size": 1.0, "bid_size": 1.2},
+]
+
+def recording():
+    messages = [
+        {"type": "ticker", "code": "KRW-BTC", "trade_price": 100_050_000.0, "timestamp": 1_700_000_000_000},
+        {"type": "orderbook", "code": "KRW-BTC", "timestamp": 1_700_000_000_100,
+         "total_ask_size": 1.5, "total_bid_size": 1.9, "orderbook_units": UNITS},
+        # 구독하지 않은 종목은 재생 서버가 보내지 않고, 받더라도 피드가 무시해야 함
+        {"type": "ticker", "code": "KRW-ETH", "trade_price": 5_000_000.0, "timestamp": 1_700_000_000_000},
+    ]
+    messages += [
+        {"type": "trade", "code": "KRW-BTC", "trade_price": 100_000_000.0 + i, "trade_volume": 0.01,
+         "trade_timestamp": 1_700_000_000_000 + i * 1000}
+        for i in range(5)
+    ]
+    return messages
+
+@pytest.fixture
+def feed():
+    with ReplayServer(recording()) as server:
+        feed = MarketFeed(["KRW-BTC"], url=server.url, tape_size=3).start()
+        try:
+            assert feed.wait_ready(timeout=5)
+            deadline = time.time() + 5
+            while len(feed.trades()) < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            yield feed
+        finally:
+            feed.stop()
+
+def test_latest_ticker_and_orderbook(feed):
+    assert feed.ticker()["trade_price"] == 100_050_000.0
+    orderbook = feed.orderbook()
+    # pyupbit.get_orderbook과 같은 형태
+    assert orderbook == {
+        "market": "KRW-BTC", "timestamp": 1_700_000_000_100,
+        "total_ask_size": 1.5, "total_bid_size": 1.9, "orderbook_units": UNITS,
+    }
+    assert feed.latest("ticker", "KRW-ETH") is None
+
+def test_trade_tape_is_bounded_and_filterable(feed):
+    trades = feed.trades()
+    assert [trade["trade_price"] for trade in trades] == [100_000_002.0, 100_000_003.0, 100_000_004.0]
+    assert [trade["trade_timestamp"] for trade in feed.trades(since_ms=1_700_000_003_000)] == [1_700_000_004_000]
+
+def test_stale_values_are_not_returned(feed):
+    time.sleep(0.05)
+    assert feed.latest("ticker", "KRW-BTC", max_age=0.01) is None
+    feed.stale_after = 0.01
+    assert feed.orderbook() is None
+
+def test_snapshot_cache_reads_from_feed(feed):
+    snapshot = MarketSnapshotCache("KRW-BTC", feed=feed).refresh()
+    assert snapshot.ask_price == 100_100_000.0
+    assert snapshot.bid_price == 100_000_000.0
+
+def test_start_fails_fast_without_websockets(monkeypatch):
+    monkeypatch.setitem(sys.modules, "websockets", None)
+    feed = MarketFeed(["KRW-BTC"], url="ws://127.0.0.1:1")
+    with pytest.raises(ImportError):
+        feed.start()
+    assert feed._thread is None
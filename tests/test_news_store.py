@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+from news_store import NewsStore, url_source
+
+@pytest.fixture
+def store(tmp_path):
+    return NewsStore(str(tmp_path / "news.sqlite"))
+
+@pytest.mark.parametrize("url, source", [
+    ("https://www.coindesk.com/markets/2024/01/01/bitcoin", "www.coindesk.com"),
+    ("coindesk.com/markets/bitcoin", ""),
+    ("http://[::1", ""),
+    ("", ""),
+])
+def test_url_source(url, source):
+    assert url_source(url) == source
+
+def test_add_keeps_batch_with_schemeless_url(store):
+    now = time.time()
+    results = [
+        {"url": "https://www.coindesk.com/a", "title": "Bitcoin rallies past resistance"},
+        {"url": "coindesk.com/b", "title": "ETF inflows rise"},
+        {"url": "https://news.example.com/c", "title": "Bitcoin rallies past resistance - Example"},
+    ]
+    # 스킴 없는 URL이 있어도 배치 전체가 버려지지 않고, 매체만 다른 같은 기사는 걸러짐
+    assert store.add(results, now) == 2
+    sources = {title: source for _, source, title in store.top(10, now)}
+    assert sources == {"Bitcoin rallies past resistance": "www.coindesk.com", "ETF inflows rise": ""}
@@ -0,0 +1,74 @@
+import json
+
+from indicators import add_indicators
+from market_data import serialize_market_data, truncate_market_data
+from prompt_builder import TRUNCATED_MARK, PromptSection, build_prompt, truncate_items, truncate_text
+from token_counter import count_tokens
+
+def news_lines(count):
+    # 최신 기사가 앞에 오는 "날짜 | 출처 | 제목" 줄 목록 (NewsStore.get_news 형식)
+    return "\n".join(f"2024-01-{31 - i:02d} | source | headline number {i} about bitcoin markets" for i in range(count))
+
+def test_build_prompt_stays_under_ceiling():
+    sections = [
+        PromptSection("market_data", "Market Analysis", "price " * 2000, budget=800, priority=3),
+        PromptSection("news", "News", news_lines(200), budget=400, priority=1, separator="\n"),
+        PromptSection("status", "Status", "balance " * 50, budget=100, priority=4),
+    ]
+    prompt, breakdown = build_prompt(sections, ceiling=900)
+    assert count_tokens(prompt) <= 900
+    for section in sections:
+        original, final = breakdown[section.name]
+        assert original == count_tokens(section.content)
+        assert final <= section.budget
+    assert prompt.startswith("Here is the latest market data and relevant analysis:")
+
+def test_lowest_priority_section_is_trimmed_first():
+    news, decisions = news_lines(40), news_lines(40)
+    sections = [
+        PromptSection("decisions", "Previous Decisions", decisions, budget=10000, priority=2, separator="\n"),
+        PromptSection("news", "News", news, budget=10000, priority=1, separator="\n"),
+    ]
+    # 두 구역 모두 예산 안이지만 합계가 한도를 넘으면 priority가 낮은 news만 줄어듦
+    ceiling = count_tokens(decisions) + count_tokens(news) // 2
+    _, breakdown = build_prompt(sections, ceiling=ceiling)
+    assert breakdown["decisions"] == (count_tokens(decisions), count_tokens(decisions))
+    assert 0 < breakdown["news"][1] < breakdown["news"][0]
+
+    # news를 모두 비워도 모자라면 다음 우선순위 구역을 줄임
+    _, breakdown = build_prompt(sections, ceiling=count_tokens(decisions) // 2)
+    assert breakdown["news"][1] == 0
+    assert 0 < breakdown["decisions"][1] < breakdown["decisions"][0]
+
+def test_truncate_items_drops_oldest_lines():
+    content = news_lines(30)
+    lines = content.split("\n")
+    budget = sum(count_tokens(line + "\n") for line in lines[:10])
+    kept = truncate_items(content, budget, "\n").split("\n")
+    # 최신순이므로 앞쪽 10줄(최신)이 남고 뒤쪽(오래된) 줄이 버려짐
+    assert kept == lines[:10]
+    assert truncate_items(content, 0, "\n") == ""
+
+def test_truncate_text_marks_cut():
+    text = "word " * 500
+    cut = truncate_text(text, 50)
+    assert cut.endswith(TRUNCATED_MARK) and count_tokens(cut) <= 50
+    assert truncate_text("short", 50) == "short"
+
+def test_truncate_market_data_keeps_valid_json(make_ohlcv):
+    frames = {
+        "daily": add_indicators(make_ohlcv(120, freq='D')),
+        "hourly": add_indicators(make_ohlcv(120, freq='h', seed=1)),
+    }
+    content = serialize_market_data(frames)
+    budget = count_tokens(content) // 3
+    truncated = truncate_market_data(content, budget)
+    assert count_tokens(truncated) <= budget
+    original, payload = json.loads(content), json.loads(truncated)
+    assert set(payload) == set(original)
+    for name, table in payload.items():
+        assert table["columns"] == original[name]["columns"]
+        rows = original[name]["data"]
+        # 가장 오래된 행부터 버리므로 남은 행은 원래 표의 최신 구간
+        assert table["data"] == rows[len(rows) - len(table["data"]):]
+    assert truncate_market_data(content, count_tokens(content)) == content
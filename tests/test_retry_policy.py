@@ -0,0 +1,57 @@
+import logging
+import time
+
+import pytest
+
+from retry_policy import RetryPolicy, TransientError, is_retryable, retry_after
+
+class HTTPStatusError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = type("Response", (), {"status_code": status, "headers": headers or {}})()
+
+def test_classification():
+    pyupbit_errors = pytest.importorskip("pyupbit.errors")
+    assert is_retryable(HTTPStatusError(429)) and is_retryable(HTTPStatusError(503))
+    assert not is_retryable(HTTPStatusError(400)) and not is_retryable(HTTPStatusError(401))
+    assert is_retryable(TransientError("empty")) and is_retryable(ConnectionError())
+    assert not is_retryable(ValueError("bad json"))
+    # NonceUsed는 401이지만 새 nonce로 다시 보내면 성공할 수 있음
+    assert is_retryable(pyupbit_errors.NonceUsed())
+    assert not is_retryable(pyupbit_errors.InValidAccessKey())
+    assert is_retryable(pyupbit_errors.TooManyRequests())
+
+def test_retry_after_headers():
+    assert retry_after(HTTPStatusError(429, {"retry-after": "2"})) == 2.0
+    assert retry_after(HTTPStatusError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after(HTTPStatusError(503)) is None
+
+def test_retries_until_success():
+    calls = []
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TransientError("try again")
+        return "ok"
+    assert RetryPolicy("test", max_attempts=3, base_delay=0.01).call(flaky) == "ok"
+    assert len(calls) == 3
+
+def test_fatal_error_is_not_retried():
+    calls = []
+    def fatal():
+        calls.append(1)
+        raise HTTPStatusError(400)
+    with pytest.raises(HTTPStatusError):
+        RetryPolicy("test", max_attempts=5, base_delay=0.01).call(fatal)
+    assert len(calls) == 1
+
+def test_deadline_at_limits_backoff_and_is_logged(caplog):
+    def limited():
+        raise HTTPStatusError(429, {"retry-after": "5"})
+    start = time.monotonic()
+    with caplog.at_level(logging.ERROR, logger="retry_policy"), pytest.raises(HTTPStatusError):
+        RetryPolicy("test", deadline=60).call(limited, deadline_at=time.monotonic() + 1.0)
+    assert time.monotonic() - start < 0.5
+    # 로그에는 정책 상한(60s)이 아니라 실제 예산(deadline_at)이 찍혀야 함
+    assert "deadline 1.00s" in caplog.text and "deadline 60" not in caplog.text
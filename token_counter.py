@@ -0,0 +1,32 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    # tiktoken 인코딩은 처음 사용할 때 한 번만 불러옴 (설치 안 됨 / 다운로드 실패 시 None)
+    # o200k_base 파일은 처음 한 번 내려받음 - 오프라인 환경은 TIKTOKEN_CACHE_DIR에 미리 받아둔 캐시 디렉터리를 지정
+    # 동시 수집 스레드가 불러오는 도중에 근사치로 빠지지 않도록, 다른 호출은 불러오기가 끝날 때까지 기다림
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    logger.warning(f"tiktoken을 사용할 수 없어 토큰 수를 근사치(글자 수 / 4)로 계산합니다: {e}")
+                _encoding_loaded = True
+    return _encoding
+
+def count_tokens(text):
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4